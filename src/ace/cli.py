@@ -6,10 +6,34 @@ from ace.logging_config import configure_logging
 logger= logging.getLogger(__name__)
 
 
+def _run_batch(args: argparse.Namespace) -> None:
+    from ace.core.batch import load_goals, run_batch
+
+    goals = load_goals(args.goals)
+    report = run_batch(goals, work_dir=args.work_dir, workers=args.workers)
+    report.write(args.report)
+    logger.info(
+        "Batch done: %d/%d goals completed in %.2fs (report: %s)",
+        report.succeeded, len(report.goals), report.duration_s, args.report,
+    )
+
+
 def main() -> None:
     parser= argparse.ArgumentParser(prog="ace", description="Autonomous Cognitive Engine (ACE)")
     parser.add_argument("--log-level", default=None, help="DEBUG/INFO/WARNING/ERROR")
+    sub = parser.add_subparsers(dest="command")
+
+    batch = sub.add_parser("batch", help="Run a file of goals across a process pool")
+    batch.add_argument("goals", help="Goals file: one goal per line, or .jsonl with a 'goal' key")
+    batch.add_argument("--workers", type=int, default=4)
+    batch.add_argument("--work-dir", default="batch", help="Per-worker data/audit root")
+    batch.add_argument("--report", default="batch/report.json")
+    batch.set_defaults(func=_run_batch)
+
     args=parser.parse_args()
 
     configure_logging(args.log_level or "INFO")
-    logger.info("ACE CLI ready.")
\ No newline at end of file
+    if getattr(args, "func", None) is None:
+        logger.info("ACE CLI ready.")
+        return
+    args.func(args)
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from multiprocessing.util import Finalize
+from pathlib import Path
+from typing import Any
+
+from ace.core.agent import Agent
+from ace.core.goal_journal import GoalJournal, goal_id_for
+from ace.core.memory import Memory
+from ace.core.planner import RuleBasedPlanner
+from ace.core.reasoning.rule_reasoner import RuleBasedReasoner
+from ace.core.reflector import Reflector
+from ace.core.state_machine import AgentStateMachine
+from ace.core.stop import StopConfig
+from ace.core.tools.file_writer import FileWriterTool
+from ace.core.tools.python_runner import PythonRunnerTool
+from ace.core.tools.registry import ToolRegistry
+from ace.core.tools.tool_executor import ToolExecutor
+from ace.core.tools.web_search import WebSearchTool
+
+
+def load_goals(path: Path | str) -> list[str]:
+    """Read goals from a file: one per line, or ``{"goal": ...}`` objects for ``.jsonl``.
+
+    Blank lines and ``#`` comments are skipped.
+    """
+    goals: list[str] = []
+    jsonl = Path(path).suffix == ".jsonl"
+    for ln in Path(path).read_text(encoding="utf-8").splitlines():
+        ln = ln.strip()
+        if not ln or ln.startswith("#"):
+            continue
+        goals.append(json.loads(ln)["goal"] if jsonl else ln)
+    return goals
+
+
+def build_agent(worker_dir: Path) -> Agent:
+    """Agent with its own tool registry, memory DB and audit dir under ``worker_dir``."""
+    registry = ToolRegistry()
+    registry.register(WebSearchTool())
+    registry.register(PythonRunnerTool())
+    registry.register(FileWriterTool(base_dir=str(worker_dir / "artifacts")))
+    return Agent(
+        memory=Memory.create_default(
+            data_dir=worker_dir / "data",
+            audit_dir=worker_dir / "audit",
+        ),
+        planner=RuleBasedPlanner(),
+        reasoner=RuleBasedReasoner(),
+        reflector=Reflector(),
+        tool_executor=ToolExecutor(registry=registry, max_retries=2),
+    )
+
+
+@dataclass
+class GoalSummary:
+    goal: str
+    goal_id: str
+    worker: str
+    reason: str
+    completed: int = 0
+    failed: int = 0
+    duration_s: float = 0.0
+    error: str | None = None
+
+
+@dataclass
+class BatchReport:
+    workers: int
+    duration_s: float
+    goals: list[GoalSummary] = field(default_factory=list)
+    run_id: str = ""
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for g in self.goals if g.reason == "Halted: All tasks completed")
+
+    def to_dict(self) -> dict[str, Any]:
+        per_worker: dict[str, dict[str, float]] = {}
+        for g in self.goals:
+            w = per_worker.setdefault(g.worker, {"goals": 0, "busy_s": 0.0})
+            w["goals"] += 1
+            w["busy_s"] = round(w["busy_s"] + g.duration_s, 4)
+        return {
+            "run_id": self.run_id,
+            "workers": self.workers,
+            "duration_s": round(self.duration_s, 4),
+            "goals_total": len(self.goals),
+            "goals_succeeded": self.succeeded,
+            "goal_time_s": round(sum(g.duration_s for g in self.goals), 4),
+            "per_worker": per_worker,
+            "goals": [asdict(g) for g in self.goals],
+        }
+
+    def write(self, path: Path | str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+
+
+# Per-process state, built once by ``_init_worker`` and reused for every goal.
+_worker: dict[str, Any] = {}
+
+
+def _init_worker(work_dir: str, run_id: str, counter: Any, stop_cfg: StopConfig) -> None:
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    name = f"worker-{index}"
+    worker_dir = Path(work_dir) / run_id / name
+    _worker.update(
+        name=name,
+        machine=AgentStateMachine(build_agent(worker_dir), audit_dir=worker_dir / "audit"),
+        stop_cfg=stop_cfg,
+    )
+    if multiprocessing.parent_process() is not None:
+        # Pool workers exit without atexit hooks; multiprocessing finalizers still run.
+        Finalize(None, _close_worker, exitpriority=10)
+
+
+def _close_worker() -> None:
+    machine: AgentStateMachine | None = _worker.pop("machine", None)
+    if machine is not None:
+        machine.close()
+        machine.agent.memory.system.close()
+    _worker.clear()
+
+
+def _run_goal(goal: str) -> GoalSummary:
+    sm: AgentStateMachine = _worker["machine"]
+    summary = GoalSummary(goal=goal, goal_id=goal_id_for(goal), worker=_worker["name"], reason="")
+    start = time.perf_counter()
+    try:
+        tasks = sm.agent.planner.decompose(goal)
+        summary.reason = sm.run_goal(goal, tasks, _worker["stop_cfg"])
+        cp = GoalJournal(sm.audit_dir / "goals", summary.goal_id).load()
+        summary.completed, summary.failed = len(cp.completed), len(cp.failed)
+    except Exception as exc:  # one bad goal must not sink the batch
+        summary.reason = "Halted: Error"
+        summary.error = f"{type(exc).__name__}: {exc}"
+    summary.duration_s = round(time.perf_counter() - start, 4)
+    return summary
+
+
+def run_batch(
+        goals: list[str],
+        work_dir: Path | str = "batch",
+        workers: int = 4,
+        stop_cfg: StopConfig | None = None,
+        run_id: str | None = None,
+        ) -> BatchReport:
+    """Run independent goals across a process pool and aggregate one report.
+
+    Each worker process builds its agent and state machine once (tool
+    registry, embedder and retrieval caches, SQLite connection) and keeps its
+    memory DB and audit trail under ``<work_dir>/<run_id>/worker-<n>/``, so
+    workers never contend on a SQLite writer lock and runs never share a
+    directory. Workers close their memory when the pool shuts down.
+    ``workers <= 1`` runs in-process, which is easier to debug.
+    """
+    stop_cfg = stop_cfg or StopConfig()
+    run_id = run_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    counter = multiprocessing.Value("i", 0)
+    start = time.perf_counter()
+    if workers <= 1:
+        _init_worker(str(work_dir), run_id, counter, stop_cfg)
+        try:
+            summaries = [_run_goal(g) for g in goals]
+        finally:
+            _close_worker()
+    else:
+        with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(str(work_dir), run_id, counter, stop_cfg),
+                ) as pool:
+            summaries = list(pool.map(_run_goal, goals))
+    return BatchReport(
+        workers=max(1, workers),
+        duration_s=time.perf_counter() - start,
+        goals=summaries,
+        run_id=run_id,
+    )
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from ace.core.fs import atomic_write_text
+
+
+class CheckpointWriter:
+    """Debounced, atomic JSON checkpoint.
+
+    ``write`` keeps only the latest state and persists it at most once per
+    ``min_interval_s``; intermediate states inside the window are coalesced.
+    Call ``flush`` at points that must be durable (e.g. goal completion).
+    """
+
+    def __init__(self, path: Path, min_interval_s: float = 0.5, fsync: bool = False) -> None:
+        self.path = Path(path)
+        self.min_interval_s = min_interval_s
+        self.fsync = fsync
+        self.writes = 0
+        self._pending: dict[str, Any] | None = None
+        self._last_write = float("-inf")
+        self._lock = threading.Lock()
+
+    def write(self, state: dict[str, Any], force: bool = False) -> None:
+        with self._lock:
+            self._pending = state
+            if force or time.monotonic() - self._last_write >= self.min_interval_s:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._pending is None:
+            return
+        atomic_write_text(self.path, json.dumps(self._pending, indent=2), fsync=self.fsync)
+        self._pending = None
+        self._last_write = time.monotonic()
+        self.writes += 1
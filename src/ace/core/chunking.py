@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+@dataclass
+class Passage:
+    """A window of a parent text; ``text == parent[start:end]``."""
+
+    index: int
+    start: int
+    end: int
+    text: str
+
+
+def _spans(
+        text: str, pattern: re.Pattern[str], lo: int = 0, hi: int | None = None
+        ) -> list[tuple[int, int]]:
+    """Non-blank ``(start, end)`` pieces of ``text[lo:hi]`` between separator matches."""
+    hi = len(text) if hi is None else hi
+    out: list[tuple[int, int]] = []
+    pos = lo
+    for m in pattern.finditer(text, lo, hi):
+        out.append((pos, m.start()))
+        pos = m.end()
+    out.append((pos, hi))
+    trimmed: list[tuple[int, int]] = []
+    for s, e in out:
+        while s < e and text[s].isspace():
+            s += 1
+        while e > s and text[e - 1].isspace():
+            e -= 1
+        if s < e:
+            trimmed.append((s, e))
+    return trimmed
+
+
+def sentence_spans(text: str) -> list[tuple[int, int]]:
+    """``(start, end)`` of each sentence (or line) in ``text``."""
+    return _spans(text, _SENTENCE_END)
+
+
+class PassageChunker:
+    """Split long texts into overlapping sentence or paragraph windows.
+
+    Units (sentences, or paragraphs with over-long ones split into sentences)
+    are packed greedily into windows of at most ``max_chars``; each window
+    after the first repeats the last ``overlap`` units of the previous one.
+    A single unit longer than ``max_chars`` becomes its own passage. Offsets
+    always point into the original text.
+    """
+
+    def __init__(self, max_chars: int = 800, overlap: int = 1, unit: str = "sentence") -> None:
+        if unit not in ("sentence", "paragraph"):
+            raise ValueError(f"unit must be 'sentence' or 'paragraph', not {unit!r}")
+        self.max_chars = max_chars
+        self.overlap = overlap
+        self.unit = unit
+
+    def _units(self, text: str) -> list[tuple[int, int]]:
+        if self.unit == "sentence":
+            return sentence_spans(text)
+        units: list[tuple[int, int]] = []
+        for s, e in _spans(text, _PARAGRAPH_BREAK):
+            if e - s <= self.max_chars:
+                units.append((s, e))
+            else:
+                units.extend(_spans(text, _SENTENCE_END, s, e))
+        return units
+
+    def split(self, text: str) -> list[Passage]:
+        units = self._units(text)
+        if not units:
+            return []
+        if units[-1][1] - units[0][0] <= self.max_chars:
+            s, e = units[0][0], units[-1][1]
+            return [Passage(0, s, e, text[s:e])]
+
+        windows: list[tuple[int, int]] = []  # unit index ranges [i, j)
+        i = 0
+        while i < len(units):
+            j = i + 1
+            while j < len(units) and units[j][1] - units[i][0] <= self.max_chars:
+                j += 1
+            windows.append((i, j))
+            if j == len(units):
+                break
+            # Step back for overlap, but always move forward by at least one unit.
+            i = max(i + 1, j - self.overlap)
+
+        return [
+            Passage(n, units[i][0], units[j - 1][1], text[units[i][0] : units[j - 1][1]])
+            for n, (i, j) in enumerate(windows)
+        ]
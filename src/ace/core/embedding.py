@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import math
+import threading
+import zlib
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Protocol
+
+from ace.core.text import fingerprint, normalize_text
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+
+class Embedder(Protocol):
+    dim: int
+
+    def embed(self, text: str) -> list[float]: ...
+
+    def embed_many(self, texts: Sequence[str]) -> list[list[float]]: ...
+
+
+class HashingEmbedder:
+    """Offline embedder: signed feature hashing of word tokens and char n-grams.
+
+    Deterministic across processes (crc32, not ``hash()``), needs no model files
+    and returns L2-normalized vectors of size ``dim``.
+    """
+
+    def __init__(self, dim: int = 256, ngram_range: tuple[int, int] = (3, 5)) -> None:
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def _features(self, text: str) -> list[str]:
+        norm = normalize_text(text)
+        feats = norm.split()
+        lo, hi = self.ngram_range
+        for token in feats[:]:
+            padded = f" {token} "
+            for n in range(lo, hi + 1):
+                feats.extend(padded[i : i + n] for i in range(len(padded) - n + 1))
+        return feats
+
+    def _buckets(self, text: str) -> tuple[list[int], list[float]]:
+        idx: list[int] = []
+        signs: list[float] = []
+        for feat in self._features(text):
+            h = zlib.crc32(feat.encode("utf-8"))
+            idx.append(h % self.dim)
+            signs.append(1.0 if (h >> 31) & 1 else -1.0)
+        return idx, signs
+
+    def embed(self, text: str) -> list[float]:
+        idx, signs = self._buckets(text)
+        if np is not None:
+            vec = np.bincount(
+                np.asarray(idx, dtype=np.int64),
+                weights=np.asarray(signs),
+                minlength=self.dim,
+            )
+            norm = float(np.linalg.norm(vec))
+            return (vec / norm if norm > 0 else vec).tolist()
+
+        out = [0.0] * self.dim
+        for i, s in zip(idx, signs, strict=True):
+            out[i] += s
+        norm = math.sqrt(sum(x * x for x in out))
+        return [x / norm for x in out] if norm > 0 else out
+
+    def embed_many(self, texts: Sequence[str]) -> list[list[float]]:
+        return [self.embed(t) for t in texts]
+
+
+class CachedEmbedder:
+    """Content-addressed LRU cache in front of another embedder.
+
+    Keys are SHA-256 fingerprints of the normalized text, so the same chunk
+    stored again under a new record id is never embedded twice.
+    """
+
+    def __init__(self, inner: Embedder, max_items: int = 10_000) -> None:
+        self.inner = inner
+        self.dim = inner.dim
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> list[float] | None:
+        with self._lock:
+            vec = self._cache.get(key)
+            if vec is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return vec
+
+    def _put(self, key: str, vec: list[float]) -> None:
+        with self._lock:
+            self._cache[key] = vec
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_items:
+                self._cache.popitem(last=False)
+
+    def embed(self, text: str) -> list[float]:
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: Sequence[str]) -> list[list[float]]:
+        keys = [fingerprint(t) for t in texts]
+        out: list[list[float] | None] = [self._get(k) for k in keys]
+
+        # Embed each distinct missing text once, even if it repeats in the batch.
+        missing: dict[str, int] = {}
+        for i, (key, vec) in enumerate(zip(keys, out, strict=True)):
+            if vec is None and key not in missing:
+                missing[key] = i
+        if missing:
+            fresh = self.inner.embed_many([texts[i] for i in missing.values()])
+            computed = dict(zip(missing, fresh, strict=True))
+            for key, vec in computed.items():
+                self._put(key, vec)
+            out = [
+                vec if vec is not None else computed[key]
+                for key, vec in zip(keys, out, strict=True)
+            ]
+        return out  # type: ignore[return-value]
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._cache)}
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import IO, Any
+
+from ace.core.models import Task
+from ace.core.stop import StopConfig, StopTracker
+
+
+def goal_id_for(goal: str) -> str:
+    """Stable id for a goal text, used to name its journal."""
+    return hashlib.sha256(goal.strip().encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class GoalCheckpoint:
+    """Goal run state rebuilt from a journal."""
+
+    goal_id: str
+    goal: str
+    tasks: list[Task]
+    stop_cfg: StopConfig
+    completed: set[str] = field(default_factory=set)
+    failed: set[str] = field(default_factory=set)
+    results: dict[str, str] = field(default_factory=dict)
+    iterations: int = 0
+    no_progress_steps: int = 0
+    halted: str | None = None
+
+    @property
+    def pending(self) -> list[Task]:
+        done = self.completed | self.failed
+        return [t for t in self.tasks if t.id not in done]
+
+    def tracker(self) -> StopTracker:
+        return StopTracker(
+            self.stop_cfg,
+            iterations=self.iterations,
+            no_progress_steps=self.no_progress_steps,
+        )
+
+
+class GoalJournal:
+    """Durable append-only event log for one goal run (``<dir>/<goal_id>.jsonl``).
+
+    Events: ``start`` (goal, tasks, stop config), ``task`` (outcome, result and
+    tracker counters after the task) and ``halt``. Each event is flushed and
+    fsynced, so a crash loses at most the task that was running.
+    """
+
+    def __init__(self, directory: Path, goal_id: str) -> None:
+        self.goal_id = goal_id
+        self.path = Path(directory) / f"{goal_id}.jsonl"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle: IO[str] | None = None
+
+    def _append(self, event: dict[str, Any]) -> None:
+        if self._handle is None:
+            self._handle = open(self.path, "a", encoding="utf-8")
+        self._handle.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+
+    def start(self, goal: str, tasks: list[Task], stop_cfg: StopConfig) -> None:
+        """Begin a fresh journal, discarding any previous run of this goal id."""
+        self.close()
+        self.path.unlink(missing_ok=True)
+        self._append(
+            {
+                "event": "start",
+                "goal": goal,
+                "tasks": [asdict(t) for t in tasks],
+                "stop_cfg": asdict(stop_cfg),
+            }
+        )
+
+    def task_done(self, task_id: str, ok: bool, result: str, tracker: StopTracker) -> None:
+        self._append(
+            {
+                "event": "task",
+                "task_id": task_id,
+                "ok": ok,
+                "result": result,
+                "iterations": tracker.iterations,
+                "no_progress_steps": tracker.no_progress_steps,
+            }
+        )
+
+    def halt(self, reason: str, tracker: StopTracker) -> None:
+        self._append(
+            {
+                "event": "halt",
+                "reason": reason,
+                "iterations": tracker.iterations,
+                "no_progress_steps": tracker.no_progress_steps,
+            }
+        )
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def load(self) -> GoalCheckpoint:
+        if not self.path.exists():
+            raise FileNotFoundError(f"No journal for goal {self.goal_id!r} at {self.path}")
+
+        cp: GoalCheckpoint | None = None
+        with open(self.path, encoding="utf-8") as f:
+            for ln in f:
+                try:
+                    ev = json.loads(ln)
+                except json.JSONDecodeError:
+                    continue  # torn write from a crash
+                kind = ev.get("event")
+                if kind == "start":
+                    cp = GoalCheckpoint(
+                        goal_id=self.goal_id,
+                        goal=ev["goal"],
+                        tasks=[Task(**t) for t in ev["tasks"]],
+                        stop_cfg=StopConfig(**ev["stop_cfg"]),
+                    )
+                    continue
+                if cp is None:
+                    continue
+                if kind == "task":
+                    (cp.completed if ev["ok"] else cp.failed).add(ev["task_id"])
+                    cp.results[ev["task_id"]] = ev.get("result", "")
+                elif kind == "halt":
+                    cp.halted = ev["reason"]
+                cp.iterations = ev.get("iterations", cp.iterations)
+                cp.no_progress_steps = ev.get("no_progress_steps", cp.no_progress_steps)
+
+        if cp is None:
+            raise ValueError(f"Journal {self.path} has no start event")
+        return cp
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from pathlib import Path
 
+from ace.core.embedding import CachedEmbedder, HashingEmbedder
 from ace.core.memory_store import SQLiteMemoryStore
 from ace.core.memory_system import EpisodicMemory, MemorySystem, ShortTermMemory
 
@@ -11,9 +13,22 @@ class Memory:
     system: MemorySystem
 
     @classmethod
-    def create_default(cls) -> Memory:
-        stm = ShortTermMemory(max_items=20)
+    def create_default(
+            cls,
+            write_behind: bool = False,
+            data_dir: Path | str = "data",
+            audit_dir: Path | str = "audit",
+            ) -> Memory:
+        data_dir = Path(data_dir)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        stm = ShortTermMemory(max_items=20, path=data_dir / "stm.json")
         stm.load()
-        episodic = EpisodicMemory(episodes_path="audit/episodes.jsonl")
-        ltm = SQLiteMemoryStore(db_path="data/memory.db")
-        return cls(system=MemorySystem(stm=stm, episodic=episodic, ltm=ltm))
+        episodic = EpisodicMemory(episodes_path=Path(audit_dir) / "episodes.jsonl")
+        ltm = SQLiteMemoryStore(
+            db_path=data_dir / "memory.db",
+            embedder=CachedEmbedder(HashingEmbedder()),
+        )
+        system = MemorySystem(stm=stm, episodic=episodic, ltm=ltm)
+        if write_behind:
+            system.enable_write_behind()
+        return cls(system=system)
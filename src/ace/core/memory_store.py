@@ -1,12 +1,21 @@
 from __future__ import annotations
 
 import json
+import re
 import sqlite3
+import threading
 import time
-from dataclasses import dataclass
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+from ace.core.chunking import PassageChunker
+from ace.core.embedding import Embedder
+from ace.core.text import fingerprint
+from ace.core.vector_index import VectorIndex, pack_vector, unpack_vector
+
 
 @dataclass
 class MemoryRecord:
@@ -15,20 +24,260 @@ class MemoryRecord:
     created_at: float
     tags: list[str]
     metadata: dict[str, Any]
-    embedding: list[float] | None = None  # embedding-ready placeholder
+    embedding: list[float] | None = None  # stored as a packed float32 blob
+
+
+RECORD_COLUMNS: tuple[str, ...] = ("id", "text", "created_at", "tags", "metadata", "embedding")
+
+_MISSING = object()
+
+
+class LazyMemoryRecord:
+    """Read-side record that decodes ``tags``/``metadata``/``embedding`` on first access.
+
+    Built from a projected row: columns that were not selected raise
+    ``AttributeError`` instead of silently looking empty.
+    """
+
+    __slots__ = ("id", "_text", "_created_at", "_raw", "_decoded")
+
+    def __init__(self, columns: Sequence[str], row: Sequence[Any]) -> None:
+        values = dict(zip(columns, row, strict=True))
+        self.id: str = values.pop("id")
+        self._text = values.pop("text", _MISSING)
+        self._created_at = values.pop("created_at", _MISSING)
+        self._raw: dict[str, Any] = values
+        self._decoded: dict[str, Any] = {}
+
+    def _column(self, name: str, value: Any) -> Any:
+        if value is _MISSING:
+            raise AttributeError(f"column '{name}' was not selected for record {self.id!r}")
+        return value
+
+    @property
+    def text(self) -> str:
+        return self._column("text", self._text)
+
+    @property
+    def created_at(self) -> float:
+        return float(self._column("created_at", self._created_at))
+
+    def _decode(self, name: str) -> Any:
+        if name not in self._decoded:
+            raw = self._column(name, self._raw.get(name, _MISSING))
+            if name == "embedding":
+                self._decoded[name] = unpack_vector(raw) if raw else None
+            else:
+                self._decoded[name] = json.loads(raw)
+        return self._decoded[name]
+
+    @property
+    def tags(self) -> list[str]:
+        return self._decode("tags")
+
+    @property
+    def metadata(self) -> dict[str, Any]:
+        return self._decode("metadata")
+
+    @property
+    def embedding(self) -> list[float] | None:
+        return self._decode("embedding")
+
+    def __repr__(self) -> str:
+        return f"LazyMemoryRecord(id={self.id!r})"
+
+
+def _projection(columns: Sequence[str] | None) -> tuple[str, ...]:
+    if columns is None:
+        return RECORD_COLUMNS
+    unknown = set(columns) - set(RECORD_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown memory columns: {sorted(unknown)}")
+    # id is always selected; keep the canonical column order.
+    return tuple(c for c in RECORD_COLUMNS if c == "id" or c in columns)
+
+
+DAY = 86_400.0
+
+
+def _default_tag_ttls() -> dict[str, float]:
+    return {
+        "retrieval": 7 * DAY,
+        "chunk": 7 * DAY,
+        "reflection": 30 * DAY,
+        "error": 30 * DAY,
+        "episode": 365 * DAY,
+    }
+
+
+@dataclass
+class RetentionPolicy:
+    """How long-term memory is deduplicated, expired and size-capped.
+
+    A record expires once it is older than the longest TTL among its tags;
+    records without any TTL'd tag only leave through the ``max_records`` cap,
+    which evicts least recently accessed (then least hit) records first.
+    Access stats from reads are buffered in memory and written with the next
+    write, ``compact`` or ``close`` (or once ``touch_buffer`` records are
+    pending), so searches do not open write transactions.
+    """
+
+    dedup: bool = True
+    tag_ttls: dict[str, float] = field(default_factory=_default_tag_ttls)
+    max_records: int | None = 50_000
+    track_access: bool = True
+    touch_buffer: int = 1024  # records with pending access stats before a read flushes them
+    compact_every: int = 500  # writes between automatic compact() runs; 0 disables
+    vacuum_pages: int = 256  # pages released per incremental VACUUM step
+
+
+@dataclass
+class CompactionReport:
+    merged: int = 0
+    expired: int = 0
+    evicted: int = 0
+    vacuumed_pages: int = 0
+
+
+@dataclass
+class MemoryFilter:
+    """Record filters pushed down into SQL; ``tags`` must all be present."""
+
+    tags: list[str] = field(default_factory=list)
+    task_id: str | None = None
+    source: str | None = None
+    success: bool | None = None
+
+    def to_sql(self, alias: str = "r") -> tuple[str, list[Any]]:
+        clauses: list[str] = []
+        params: list[Any] = []
+        for tag in dict.fromkeys(self.tags):
+            clauses.append(
+                "EXISTS (SELECT 1 FROM record_tags AS rt "
+                f"WHERE rt.tag = ? AND rt.record_id = {alias}.id)"
+            )
+            params.append(tag)
+        for column in ("task_id", "source", "success"):
+            value = getattr(self, column)
+            if value is not None:
+                clauses.append(f"{alias}.{column} = ?")
+                params.append(int(value) if column == "success" else value)
+        return " AND ".join(clauses), params
+
+
+@dataclass
+class PassageHit:
+    """A passage of a long-term record; ``start``/``end`` index into the record text."""
+
+    record_id: str
+    index: int
+    start: int
+    end: int
+    text: str
+    score: float = 0.0
+
+
+def _extracted(metadata: dict[str, Any]) -> tuple[Any, Any, Any]:
+    """Metadata values mirrored into indexed columns: task_id, source, success."""
+    success = metadata.get("success")
+    return (
+        metadata.get("task_id"),
+        metadata.get("source"),
+        int(success) if isinstance(success, bool) else None,
+    )
+
+
+# Bumped whenever _migrate learns a new step; stored in PRAGMA user_version.
+SCHEMA_VERSION = 5
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_UPSERT_SQL = """
+    INSERT INTO ltm_records (
+        id, text, created_at, tags, metadata, embedding, content_hash, last_accessed,
+        task_id, source, success
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        text=excluded.text,
+        created_at=excluded.created_at,
+        tags=excluded.tags,
+        metadata=excluded.metadata,
+        embedding=COALESCE(excluded.embedding, ltm_records.embedding),
+        content_hash=excluded.content_hash,
+        last_accessed=excluded.last_accessed,
+        task_id=excluded.task_id,
+        source=excluded.source,
+        success=excluded.success
+"""
+
+
+def _fts_query(query: str) -> str:
+    """Turn free text into an FTS5 MATCH expression (OR of quoted tokens)."""
+    tokens = dict.fromkeys(t.lower() for t in _TOKEN_RE.findall(query))
+    return " OR ".join(f'"{t}"' for t in tokens)
 
 
 class SQLiteMemoryStore:
-    def __init__(self, db_path: str = "data/memory.db") -> None:
+    """Long-term memory on a single long-lived SQLite connection.
+
+    The connection runs in WAL mode and is shared by all threads; every access
+    goes through ``_lock`` so statements and transactions never interleave.
+    """
+
+    def __init__(
+            self,
+            db_path: str | Path = "data/memory.db",
+            synchronous: str = "NORMAL",
+            busy_timeout_ms: int = 5000,
+            embedder: Embedder | None = None,
+            retention: RetentionPolicy | None = None,
+            chunker: PassageChunker | None = None,
+            ) -> None:
         self.db_path = Path(db_path)
+        self.embedder = embedder
+        self.chunker = chunker or PassageChunker()
+        self.retention = retention or RetentionPolicy()
+        self._writes_since_compact = 0
+        # Record id -> (last access time, hits) not yet written to ltm_records.
+        self._touches: dict[str, tuple[float, int]] = {}
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.fts_enabled = False
+        self._vectors: VectorIndex | None = None  # loaded on first search_vector()
+        self._lock = threading.RLock()
+        self._con = sqlite3.connect(
+            self.db_path.as_posix(),
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        self._con.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+        # Only takes effect on a fresh file; _enable_incremental_vacuum converts old ones.
+        self._con.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._con.execute("PRAGMA journal_mode = WAL")
+        self._con.execute(f"PRAGMA synchronous = {synchronous}")
         self._init_db()
+        if self.retention.vacuum_pages > 0:
+            self._enable_incremental_vacuum()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock, self._con:
+            yield self._con
+
+    def close(self) -> None:
+        with self._lock:
+            with self._con:
+                self._write_touches()
+            self._con.close()
 
-    def _connect(self) -> sqlite3.Connection:
-        return sqlite3.connect(self.db_path.as_posix())
+    def __enter__(self) -> SQLiteMemoryStore:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
 
     def _init_db(self) -> None:
-        with self._connect() as con:
+        with self._transaction() as con:
             con.execute(
                 """
                 CREATE TABLE IF NOT EXISTS ltm_records (
@@ -37,42 +286,409 @@ class SQLiteMemoryStore:
                     created_at REAL NOT NULL,
                     tags TEXT NOT NULL,
                     metadata TEXT NOT NULL,
-                    embedding TEXT
+                    embedding BLOB
                 )
                 """
             )
+            self._migrate(con)
 
-    def upsert(self, record: MemoryRecord) -> None:
-        with self._connect() as con:
+    def _migrate(self, con: sqlite3.Connection) -> None:
+        version = con.execute("PRAGMA user_version").fetchone()[0]
+        if version < 2:
+            # Embeddings used to be JSON text; rewrite them as float32 blobs.
+            rows = con.execute(
+                "SELECT rowid, embedding FROM ltm_records WHERE typeof(embedding) = 'text'"
+            ).fetchall()
+            con.executemany(
+                "UPDATE ltm_records SET embedding = ? WHERE rowid = ?",
+                [(pack_vector(json.loads(emb)), rowid) for rowid, emb in rows],
+            )
+        if version < 3:
+            con.execute("ALTER TABLE ltm_records ADD COLUMN content_hash TEXT")
+            con.execute("ALTER TABLE ltm_records ADD COLUMN last_accessed REAL")
+            con.execute("ALTER TABLE ltm_records ADD COLUMN hits INTEGER NOT NULL DEFAULT 0")
+            rows = con.execute("SELECT rowid, text FROM ltm_records").fetchall()
+            con.executemany(
+                "UPDATE ltm_records SET content_hash = ?, last_accessed = created_at "
+                "WHERE rowid = ?",
+                [(fingerprint(text), rowid) for rowid, text in rows],
+            )
+            con.execute("CREATE INDEX ltm_content_hash ON ltm_records(content_hash)")
+            con.execute("CREATE INDEX ltm_last_accessed ON ltm_records(last_accessed)")
+        if version < 4:
+            for column in ("task_id TEXT", "source TEXT", "success INTEGER"):
+                con.execute(f"ALTER TABLE ltm_records ADD COLUMN {column}")
             con.execute(
                 """
-                INSERT INTO ltm_records (id, text, created_at, tags, metadata, embedding)
-                VALUES (?, ?, ?, ?, ?, ?)
-                ON CONFLICT(id) DO UPDATE SET
-                    text=excluded.text,
-                    created_at=excluded.created_at,
-                    tags=excluded.tags,
-                    metadata=excluded.metadata,
-                    embedding=excluded.embedding
-                """,
+                CREATE TABLE record_tags (
+                    tag TEXT NOT NULL,
+                    record_id TEXT NOT NULL,
+                    PRIMARY KEY (tag, record_id)
+                ) WITHOUT ROWID
+                """
+            )
+            con.execute("CREATE INDEX record_tags_record ON record_tags(record_id)")
+            con.execute(
+                """
+                CREATE TRIGGER ltm_records_tags_ad AFTER DELETE ON ltm_records BEGIN
+                    DELETE FROM record_tags WHERE record_id = old.id;
+                END
+                """
+            )
+            rows = con.execute("SELECT id, tags, metadata FROM ltm_records").fetchall()
+            con.executemany(
+                "UPDATE ltm_records SET task_id = ?, source = ?, success = ? WHERE id = ?",
+                [(*_extracted(json.loads(meta)), rid) for rid, _, meta in rows],
+            )
+            self._sync_tags(con, [(rid, json.loads(tags)) for rid, tags, _ in rows])
+            for column in ("task_id", "source", "success"):
+                con.execute(f"CREATE INDEX ltm_{column} ON ltm_records({column})")
+        if version < 5:
+            con.execute(
+                """
+                CREATE TABLE ltm_passages (
+                    id INTEGER PRIMARY KEY,
+                    record_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    char_start INTEGER NOT NULL,
+                    char_end INTEGER NOT NULL,
+                    text TEXT NOT NULL,
+                    UNIQUE (record_id, idx)
+                )
+                """
+            )
+            con.execute(
+                """
+                CREATE TRIGGER ltm_records_passages_ad AFTER DELETE ON ltm_records BEGIN
+                    DELETE FROM ltm_passages WHERE record_id = old.id;
+                END
+                """
+            )
+            self._sync_passages(con, con.execute("SELECT id, text FROM ltm_records").fetchall())
+        if version < SCHEMA_VERSION:
+            con.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.fts_enabled = self._init_fts(con)
+
+    def _enable_incremental_vacuum(self) -> None:
+        with self._lock:
+            if self._con.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                # auto_vacuum can only change through a full VACUUM; pay it once.
+                self._con.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                self._con.execute("VACUUM")
+
+    def _init_fts(self, con: sqlite3.Connection) -> bool:
+        """Create the FTS5 index and its sync triggers; False if FTS5 is unavailable."""
+        existed = con.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ltm_fts'"
+        ).fetchone()
+        try:
+            con.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS ltm_fts USING fts5(
+                    text,
+                    content='ltm_records',
+                    content_rowid='rowid',
+                    tokenize='unicode61'
+                )
+                """
+            )
+        except sqlite3.OperationalError:
+            return False
+
+        con.executescript(
+            """
+            CREATE TRIGGER IF NOT EXISTS ltm_records_ai AFTER INSERT ON ltm_records BEGIN
+                INSERT INTO ltm_fts(rowid, text) VALUES (new.rowid, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS ltm_records_ad AFTER DELETE ON ltm_records BEGIN
+                INSERT INTO ltm_fts(ltm_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS ltm_records_au AFTER UPDATE OF text ON ltm_records BEGIN
+                INSERT INTO ltm_fts(ltm_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+                INSERT INTO ltm_fts(rowid, text) VALUES (new.rowid, new.text);
+            END;
+            """
+        )
+        if not existed:
+            # Databases created before the index existed: backfill from ltm_records.
+            con.execute("INSERT INTO ltm_fts(ltm_fts) VALUES ('rebuild')")
+        self._init_passage_fts(con)
+        return True
+
+    @staticmethod
+    def _init_passage_fts(con: sqlite3.Connection) -> None:
+        existed = con.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'passages_fts'"
+        ).fetchone()
+        con.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS passages_fts USING fts5(
+                text,
+                content='ltm_passages',
+                content_rowid='id',
+                tokenize='unicode61'
+            )
+            """
+        )
+        # Passages are only ever inserted and deleted, never updated in place.
+        con.executescript(
+            """
+            CREATE TRIGGER IF NOT EXISTS ltm_passages_ai AFTER INSERT ON ltm_passages BEGIN
+                INSERT INTO passages_fts(rowid, text) VALUES (new.id, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS ltm_passages_ad AFTER DELETE ON ltm_passages BEGIN
+                INSERT INTO passages_fts(passages_fts, rowid, text)
+                VALUES ('delete', old.id, old.text);
+            END;
+            """
+        )
+        if not existed:
+            con.execute("INSERT INTO passages_fts(passages_fts) VALUES ('rebuild')")
+
+    def upsert(self, record: MemoryRecord) -> None:
+        self.upsert_many([record])
+
+    def upsert_many(self, records: Iterable[MemoryRecord]) -> int:
+        """Write a batch of records in one transaction; returns the number of rows written.
+
+        With ``retention.dedup`` a record whose normalized text is already
+        stored (in the database or earlier in the batch) is merged into the
+        existing row instead: tags are unioned and metadata keys the stored
+        record lacks are added; its own values (task_id, success, ...) win.
+        An existing record rewritten with such text is merged the same way and
+        its old row removed, so no stale copy stays searchable under its id.
+        """
+        with self._lock:
+            with self._con:
+                self._write_touches()
+                batch, replaced = self._dedup(list(records))
+                if not batch:
+                    return 0
+                self._delete(replaced)
+                rows = [self._to_row(r, h) for h, r in batch]
+                self._con.executemany(_UPSERT_SQL, rows)
+                self._sync_tags(self._con, [(r.id, r.tags) for _, r in batch])
+                self._sync_passages(self._con, [(r.id, r.text) for _, r in batch])
+            if self._vectors is not None:
+                for _, rec in batch:
+                    if rec.embedding is not None:
+                        self._vectors.upsert(rec.id, rec.embedding)
+            self._writes_since_compact += len(rows)
+            every = self.retention.compact_every
+            if every and self._writes_since_compact >= every:
+                self.compact()
+        return len(rows)
+
+    def _dedup(
+            self, records: list[MemoryRecord]
+            ) -> tuple[list[tuple[str, MemoryRecord]], list[str]]:
+        """Merge duplicate texts; also returns ids merged away under another id."""
+        hashed = [(fingerprint(r.text), r) for r in records]
+        if not self.retention.dedup:
+            return hashed, []
+
+        merged: dict[str, MemoryRecord] = {}
+        merged_away: list[str] = []
+        for h, rec in hashed:
+            target = merged.get(h)
+            if target is None:
+                row = self._con.execute(
+                    "SELECT id, tags, metadata FROM ltm_records WHERE content_hash = ? LIMIT 1",
+                    (h,),
+                ).fetchone()
+                if row is None or row[0] == rec.id:
+                    merged[h] = rec
+                    continue
+                target = MemoryRecord(
+                    id=row[0],
+                    text=rec.text,
+                    created_at=rec.created_at,
+                    tags=json.loads(row[1]),
+                    metadata=json.loads(row[2]),
+                )
+                merged[h] = target
+            if rec.id != target.id:
+                merged_away.append(rec.id)
+            target.tags = list(dict.fromkeys([*target.tags, *rec.tags]))
+            target.metadata = {**rec.metadata, **target.metadata}
+            target.created_at = max(target.created_at, rec.created_at)
+            if rec.embedding is not None:
+                target.embedding = rec.embedding
+        kept = {r.id for r in merged.values()}
+        return list(merged.items()), [rid for rid in merged_away if rid not in kept]
+
+    @staticmethod
+    def _to_row(record: MemoryRecord, content_hash: str) -> tuple[Any, ...]:
+        return (
+            record.id,
+            record.text,
+            record.created_at,
+            json.dumps(record.tags),
+            json.dumps(record.metadata),
+            pack_vector(record.embedding) if record.embedding is not None else None,
+            content_hash,
+            record.created_at,
+            *_extracted(record.metadata),
+        )
+
+    @staticmethod
+    def _sync_tags(con: sqlite3.Connection, pairs: list[tuple[str, list[str]]]) -> None:
+        con.executemany("DELETE FROM record_tags WHERE record_id = ?", [(rid,) for rid, _ in pairs])
+        con.executemany(
+            "INSERT OR IGNORE INTO record_tags (tag, record_id) VALUES (?, ?)",
+            [(tag, rid) for rid, tags in pairs for tag in tags],
+        )
+
+    def _sync_passages(self, con: sqlite3.Connection, pairs: list[tuple[str, str]]) -> None:
+        """Re-chunk ``(record_id, text)`` pairs into ltm_passages."""
+        con.executemany(
+            "DELETE FROM ltm_passages WHERE record_id = ?", [(rid,) for rid, _ in pairs]
+        )
+        con.executemany(
+            "INSERT INTO ltm_passages (record_id, idx, char_start, char_end, text) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                (rid, p.index, p.start, p.end, p.text)
+                for rid, text in pairs
+                for p in self.chunker.split(text)
+            ],
+        )
+
+    def compact(self, now: float | None = None) -> CompactionReport:
+        """Merge leftover duplicates, apply tag TTLs and the size cap, then vacuum a step."""
+        now = time.time() if now is None else now
+        policy = self.retention
+        report = CompactionReport()
+        with self._lock:
+            with self._con:
+                self._write_touches()
+                if policy.dedup:
+                    report.merged = self._merge_duplicates()
+
+                expired = self._expired_ids(now)
+                self._delete(expired)
+                report.expired = len(expired)
+
+                if policy.max_records is not None:
+                    count = self._con.execute("SELECT COUNT(*) FROM ltm_records").fetchone()[0]
+                    excess = count - policy.max_records
+                    if excess > 0:
+                        victims = [
+                            rid
+                            for (rid,) in self._con.execute(
+                                "SELECT id FROM ltm_records "
+                                "ORDER BY last_accessed ASC, hits ASC LIMIT ?",
+                                (excess,),
+                            )
+                        ]
+                        self._delete(victims)
+                        report.evicted = len(victims)
+
+            if policy.vacuum_pages > 0:
+                before = self._con.execute("PRAGMA freelist_count").fetchone()[0]
+                self._con.execute(f"PRAGMA incremental_vacuum({policy.vacuum_pages})").fetchall()
+                after = self._con.execute("PRAGMA freelist_count").fetchone()[0]
+                report.vacuumed_pages = before - after
+            self._writes_since_compact = 0
+        return report
+
+    def _merge_duplicates(self) -> int:
+        """Collapse rows sharing a content hash (e.g. written before dedup existed)."""
+        hashes = self._con.execute(
+            "SELECT content_hash FROM ltm_records "
+            "GROUP BY content_hash HAVING COUNT(*) > 1"
+        ).fetchall()
+        removed: list[str] = []
+        for (h,) in hashes:
+            rows = self._con.execute(
+                "SELECT id, tags, metadata, created_at FROM ltm_records "
+                "WHERE content_hash = ? ORDER BY rowid",
+                (h,),
+            ).fetchall()
+            tags: dict[str, None] = {}
+            metadata: dict[str, Any] = {}
+            for _, t, m, _ in rows:
+                tags.update(dict.fromkeys(json.loads(t)))
+                # The oldest row is kept, and so are its metadata values.
+                for key, value in json.loads(m).items():
+                    metadata.setdefault(key, value)
+            keep = rows[0][0]
+            self._con.execute(
+                "UPDATE ltm_records SET tags = ?, metadata = ?, created_at = ?, "
+                "task_id = ?, source = ?, success = ? WHERE id = ?",
                 (
-                    record.id,
-                    record.text,
-                    record.created_at,
-                    json.dumps(record.tags),
-                    json.dumps(record.metadata),
-                    json.dumps(record.embedding) if record.embedding is not None else None,
+                    json.dumps(list(tags)),
+                    json.dumps(metadata),
+                    max(r[3] for r in rows),
+                    *_extracted(metadata),
+                    keep,
                 ),
             )
+            self._sync_tags(self._con, [(keep, list(tags))])
+            removed.extend(r[0] for r in rows[1:])
+        self._delete(removed)
+        return len(removed)
 
-    def add_text(
-            self, 
-            record_id: str, 
-            text: str, 
-            tags: list[str] | None = None, 
-            metadata: dict[str, Any] | None = None
-                 ) -> None:
-        rec = MemoryRecord(
+    def _expired_ids(self, now: float) -> list[str]:
+        ttls = self.retention.tag_ttls
+        if not ttls:
+            return []
+        placeholders = ",".join("?" * len(ttls))
+        cur = self._con.execute(
+            f"""
+            SELECT id, tags, created_at FROM ltm_records
+            WHERE created_at < ? AND id IN (
+                SELECT record_id FROM record_tags WHERE tag IN ({placeholders})
+            )
+            """,
+            (now - min(ttls.values()), *ttls),
+        )
+        out: list[str] = []
+        for rid, tags, created_at in cur:
+            ttl = max((ttls[t] for t in json.loads(tags) if t in ttls), default=None)
+            if ttl is not None and created_at < now - ttl:
+                out.append(rid)
+        return out
+
+    def _delete(self, ids: list[str]) -> None:
+        if not ids:
+            return
+        self._con.executemany("DELETE FROM ltm_records WHERE id = ?", [(rid,) for rid in ids])
+        if self._vectors is not None:
+            for rid in ids:
+                self._vectors.remove(rid)
+
+    def _touch(self, ids: list[str]) -> None:
+        """Buffer an access to ``ids``; callers hold ``_lock``."""
+        if not ids or not self.retention.track_access:
+            return
+        now = time.time()
+        for rid in ids:
+            _, hits = self._touches.get(rid, (now, 0))
+            self._touches[rid] = (now, hits + 1)
+        if len(self._touches) >= self.retention.touch_buffer:
+            with self._con:
+                self._write_touches()
+
+    def _write_touches(self) -> None:
+        """Write buffered access stats inside the caller's transaction."""
+        if not self._touches:
+            return
+        pending, self._touches = self._touches, {}
+        self._con.executemany(
+            "UPDATE ltm_records SET last_accessed = MAX(COALESCE(last_accessed, 0), ?), "
+            "hits = hits + ? WHERE id = ?",
+            [(at, hits, rid) for rid, (at, hits) in pending.items()],
+        )
+
+    @staticmethod
+    def _new_record(
+            record_id: str,
+            text: str,
+            tags: list[str] | None = None,
+            metadata: dict[str, Any] | None = None,
+            ) -> MemoryRecord:
+        return MemoryRecord(
             id=record_id,
             text=text,
             created_at=time.time(),
@@ -80,63 +696,216 @@ class SQLiteMemoryStore:
             metadata=metadata or {},
             embedding=None,
         )
-        self.upsert(rec)
 
-    def search(self, query: str, limit: int = 5) -> list[MemoryRecord]:
+    def add_text(
+            self, 
+            record_id: str, 
+            text: str, 
+            tags: list[str] | None = None, 
+            metadata: dict[str, Any] | None = None
+                 ) -> None:
+        self.upsert_many(self._embed([self._new_record(record_id, text, tags, metadata)]))
+
+    def add_texts(self, items: Iterable[dict[str, Any]]) -> int:
+        """Batch form of add_text; each item carries add_text's keyword arguments."""
+        return self.upsert_many(self._embed([self._new_record(**item) for item in items]))
+
+    def _embed(self, records: list[MemoryRecord]) -> list[MemoryRecord]:
+        if self.embedder is not None and records:
+            vecs = self.embedder.embed_many([r.text for r in records])
+            for rec, vec in zip(records, vecs, strict=True):
+                rec.embedding = vec
+        return records
+
+    def search(
+            self,
+            query: str,
+            limit: int = 5,
+            filters: MemoryFilter | None = None,
+            columns: Sequence[str] | None = None,
+            ) -> list[LazyMemoryRecord]:
+        """BM25 keyword search; ``columns`` limits which fields are selected."""
         query = query.strip()
         if not query:
             return []
 
-        with self._connect() as con:
-            cur = con.execute(
-                """
-                SELECT id, text, created_at, tags, metadata, embedding
-                FROM ltm_records
-                WHERE text LIKE ?
-                ORDER BY created_at DESC
-                LIMIT ?
-                """,
-                (f"%{query}%", limit),
-            )
+        cols = _projection(columns)
+        select = ", ".join(f"r.{c}" for c in cols)
+        where, params = (filters or MemoryFilter()).to_sql("r")
+        where = f"AND {where}" if where else ""
+        match = _fts_query(query) if self.fts_enabled else ""
+        with self._lock:
+            if match:
+                cur = self._con.execute(
+                    f"""
+                    SELECT {select}
+                    FROM ltm_fts
+                    JOIN ltm_records AS r ON r.rowid = ltm_fts.rowid
+                    WHERE ltm_fts MATCH ? {where}
+                    ORDER BY bm25(ltm_fts), r.created_at DESC
+                    LIMIT ?
+                    """,
+                    (match, *params, limit),
+                )
+            else:
+                cur = self._con.execute(
+                    f"""
+                    SELECT {select}
+                    FROM ltm_records AS r
+                    WHERE r.text LIKE ? {where}
+                    ORDER BY r.created_at DESC
+                    LIMIT ?
+                    """,
+                    (f"%{query}%", *params, limit),
+                )
             rows = cur.fetchall()
+            self._touch([row[0] for row in rows])
+
+        return [LazyMemoryRecord(cols, row) for row in rows]
+
+    def search_passages(
+            self,
+            query: str,
+            limit: int = 5,
+            filters: MemoryFilter | None = None,
+            ) -> list[PassageHit]:
+        """BM25 search over passages, so long records compete on their best window.
 
-        out: list[MemoryRecord] = []
-        for rid, text, created_at, tags, metadata, embedding in rows:
-            out.append(
-                MemoryRecord(
-                    id=rid,
-                    text=text,
-                    created_at=float(created_at),
-                    tags=json.loads(tags),
-                    metadata=json.loads(metadata),
-                    embedding=json.loads(embedding) if embedding else None,
+        Only each record's best passage is returned, so overlapping windows
+        of one record cannot fill ``limit``. ``score`` is the negated BM25
+        rank (higher is better); filters apply to the parent record.
+        """
+        query = query.strip()
+        if not query:
+            return []
+
+        where, params = (filters or MemoryFilter()).to_sql("r")
+        where = f"AND {where}" if where else ""
+        match = _fts_query(query) if self.fts_enabled else ""
+        with self._lock:
+            if match:
+                cur = self._con.execute(
+                    f"""
+                    SELECT p.record_id, p.idx, p.char_start, p.char_end, p.text, -bm25(passages_fts)
+                    FROM passages_fts
+                    JOIN ltm_passages AS p ON p.id = passages_fts.rowid
+                    JOIN ltm_records AS r ON r.id = p.record_id
+                    WHERE passages_fts MATCH ? {where}
+                    ORDER BY bm25(passages_fts), r.created_at DESC
+                    """,
+                    (match, *params),
                 )
-            )
+            else:
+                cur = self._con.execute(
+                    f"""
+                    SELECT p.record_id, p.idx, p.char_start, p.char_end, p.text, 0.0
+                    FROM ltm_passages AS p
+                    JOIN ltm_records AS r ON r.id = p.record_id
+                    WHERE p.text LIKE ? {where}
+                    ORDER BY r.created_at DESC, p.idx
+                    """,
+                    (f"%{query}%", *params),
+                )
+            # Rows arrive best first: keep each record's first passage and stop
+            # reading once ``limit`` records are found.
+            best: dict[str, PassageHit] = {}
+            for row in cur:
+                if row[0] not in best:
+                    best[row[0]] = PassageHit(*row)
+                    if len(best) >= limit:
+                        break
+            cur.close()  # release the read snapshot after an early break
+            hits = list(best.values())
+            self._touch(list(best))
+        return hits
+
+    def passages(self, record_ids: Sequence[str]) -> dict[str, list[PassageHit]]:
+        """All passages of the given records, in order."""
+        if not record_ids:
+            return {}
+        placeholders = ",".join("?" * len(record_ids))
+        with self._lock:
+            rows = self._con.execute(
+                f"""
+                SELECT record_id, idx, char_start, char_end, text FROM ltm_passages
+                WHERE record_id IN ({placeholders})
+                ORDER BY record_id, idx
+                """,
+                list(record_ids),
+            ).fetchall()
+        out: dict[str, list[PassageHit]] = {}
+        for row in rows:
+            out.setdefault(row[0], []).append(PassageHit(*row))
         return out
 
-    def recent(self, limit: int = 5) -> list[MemoryRecord]:
-        with self._connect() as con:
-            cur = con.execute(
-                """
-                SELECT id, text, created_at, tags, metadata, embedding
+    def search_vector(
+            self,
+            query_vec: list[float],
+            k: int = 5,
+            columns: Sequence[str] | None = None,
+            ) -> list[tuple[LazyMemoryRecord, float]]:
+        """Cosine top-k over stored embeddings, best match first."""
+        cols = _projection(columns)
+        with self._lock:
+            hits = self._vector_index().search(query_vec, k)
+            if not hits:
+                return []
+            placeholders = ",".join("?" * len(hits))
+            rows = self._con.execute(
+                f"""
+                SELECT {", ".join(cols)}
                 FROM ltm_records
-                ORDER BY created_at DESC
+                WHERE id IN ({placeholders})
+                """,
+                [rid for rid, _ in hits],
+            ).fetchall()
+            self._touch([row[0] for row in rows])
+
+        by_id = {row[0]: row for row in rows}
+        return [
+            (LazyMemoryRecord(cols, by_id[rid]), score) for rid, score in hits if rid in by_id
+        ]
+
+    def search_semantic(
+            self, query: str, k: int = 5, columns: Sequence[str] | None = None
+            ) -> list[tuple[LazyMemoryRecord, float]]:
+        """Embed ``query`` with the configured embedder and run search_vector."""
+        query = query.strip()
+        if self.embedder is None or not query:
+            return []
+        return self.search_vector(self.embedder.embed(query), k=k, columns=columns)
+
+    def _vector_index(self) -> VectorIndex:
+        if self._vectors is None:
+            index = VectorIndex()
+            cur = self._con.execute(
+                "SELECT id, embedding FROM ltm_records WHERE embedding IS NOT NULL"
+            )
+            for rid, blob in cur:
+                index.upsert(rid, unpack_vector(blob))
+            self._vectors = index
+        return self._vectors
+
+    def recent(
+            self,
+            limit: int = 5,
+            filters: MemoryFilter | None = None,
+            columns: Sequence[str] | None = None,
+            ) -> list[LazyMemoryRecord]:
+        cols = _projection(columns)
+        where, params = (filters or MemoryFilter()).to_sql("r")
+        where = f"WHERE {where}" if where else ""
+        with self._lock:
+            cur = self._con.execute(
+                f"""
+                SELECT {", ".join(f"r.{c}" for c in cols)}
+                FROM ltm_records AS r
+                {where}
+                ORDER BY r.created_at DESC
                 LIMIT ?
                 """,
-                (limit,),
+                (*params, limit),
             )
             rows = cur.fetchall()
 
-        out: list[MemoryRecord] = []
-        for rid, text, created_at, tags, metadata, embedding in rows:
-            out.append(
-                MemoryRecord(
-                    id=rid,
-                    text=text,
-                    created_at=float(created_at),
-                    tags=json.loads(tags),
-                    metadata=json.loads(metadata),
-                    embedding=json.loads(embedding) if embedding else None,
-                )
-            )
-        return out
+        return [LazyMemoryRecord(cols, row) for row in rows]
@@ -1,67 +1,475 @@
 from __future__ import annotations
 
+import gzip
+import itertools
 import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Sequence
 from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import IO, Any, TextIO
 
-from ace.core.memory_store import SQLiteMemoryStore
+from ace.core.fs import atomic_write_text
+from ace.core.memory_store import MemoryFilter, PassageHit, SQLiteMemoryStore
+from ace.core.text import tokenize
+from ace.core.write_behind import WriteBehindWriter
 
 
 @dataclass
 class ShortTermMemory:
+    """Ring buffer of recent items persisted as snapshot + append-only journal.
+
+    ``add`` appends one JSON line to the journal (O(1) I/O); every
+    ``snapshot_every`` adds the buffer is written atomically to ``path`` and
+    the journal is truncated. Items carry a sequence number so replaying a
+    journal left over from a crash never duplicates snapshot entries.
+    """
+
     max_items: int = 20
-    items: list[dict[str, Any]] = field(default_factory=list)
+    items: deque[dict[str, Any]] = field(default_factory=deque)
     path: Path=Path("data/stm.json")
-    
+    snapshot_every: int = 100
+
+    def __post_init__(self) -> None:
+        self.items = deque(self.items, maxlen=self.max_items)
+        self._seq = 0
+        self._since_snapshot = 0
+        self._journal: TextIO | None = None
+        self._lock = threading.RLock()
+
+    @property
+    def journal_path(self) -> Path:
+        return self.path.with_name(f"{self.path.stem}.journal.jsonl")
+
     def load(self) -> None:
+        self.items.clear()
+        self._seq = 0
+        self._since_snapshot = 0
         if self.path.exists():
             try:
-                self.items = json.loads(self.path.read_text(encoding="utf-8"))
+                data = json.loads(self.path.read_text(encoding="utf-8"))
             except json.JSONDecodeError:
-                self.items = []
+                data = []
+            if isinstance(data, list):  # legacy format: bare list of items
+                data = {"seq": 0, "items": data}
+            self.items.extend(data.get("items", []))
+            self._seq = int(data.get("seq", 0))
+
+        if self.journal_path.exists():
+            with open(self.journal_path, encoding="utf-8") as f:
+                for ln in f:
+                    try:
+                        entry = json.loads(ln)
+                    except json.JSONDecodeError:
+                        continue  # torn tail write
+                    if entry.get("seq", 0) > self._seq:
+                        self.items.append(entry["item"])
+                        self._seq = entry["seq"]
+                        self._since_snapshot += 1
+
     def save(self) -> None:
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        self.path.write_text(json.dumps(self.items, indent=2),encoding="utf-8")
+        """Write a compacted snapshot and start a fresh journal."""
+        with self._lock:
+            self._close_journal()
+            atomic_write_text(
+                self.path,
+                json.dumps({"seq": self._seq, "items": list(self.items)}, indent=2),
+            )
+            self.journal_path.unlink(missing_ok=True)
+            self._since_snapshot = 0
 
     def add(self, item: dict[str, Any]) -> None:
-        self.items.append(item)
-        if len(self.items) > self.max_items:
-            self.items = self.items[-self.max_items :]
-        self.save()
+        with self._lock:
+            self.items.append(item)
+            self._seq += 1
+            if self._journal is None:
+                self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+                self._journal = open(self.journal_path, "a", encoding="utf-8")
+            self._journal.write(json.dumps({"seq": self._seq, "item": item}) + "\n")
+            self._journal.flush()
+            self._since_snapshot += 1
+            if self._since_snapshot >= self.snapshot_every:
+                self.save()
+
+    def close(self) -> None:
+        self._close_journal()
+
+    def _close_journal(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
 
     def snapshot(self) -> list[dict[str, Any]]:
-        return list(self.items)
+        with self._lock:
+            return list(self.items)
+
+
+def _tail_lines(path: Path, limit: int, block_size: int = 8192) -> list[str]:
+    """Return the last ``limit`` lines of ``path`` by reading blocks backwards from EOF."""
+    if limit <= 0 or not path.exists():
+        return []
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b""
+        # One extra newline so the first kept line is complete.
+        while pos > 0 and data.count(b"\n") <= limit:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    return lines[-limit:]
+
+
+def _parse_lines(lines: Iterable[str]) -> list[dict[str, Any]]:
+    out: list[dict[str, Any]] = []
+    for ln in lines:
+        try:
+            out.append(json.loads(ln))
+        except json.JSONDecodeError:
+            continue
+    return out
+
+
+def _epoch(ts: Any) -> float | None:
+    """Episode timestamps are naive-UTC ISO strings; accept those, datetimes and floats."""
+    if ts is None or isinstance(ts, (int, float)):
+        return ts
+    if isinstance(ts, str):
+        try:
+            ts = datetime.fromisoformat(ts)
+        except ValueError:
+            return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+class EpisodeIndex:
+    """SQLite sidecar mapping task_id / success / timestamp to byte offsets.
+
+    ``segment`` is the closed segment file name, or ``''`` for the active file;
+    offsets are positions in the uncompressed stream.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.created = not path.exists()
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(path.as_posix(), check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode = WAL")
+        self._con.execute("PRAGMA synchronous = NORMAL")
+        with self._con:
+            self._con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS episode_index (
+                    segment TEXT NOT NULL,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    task_id TEXT,
+                    success INTEGER,
+                    ts REAL
+                )
+                """
+            )
+            for column in ("task_id", "success", "ts"):
+                self._con.execute(
+                    f"CREATE INDEX IF NOT EXISTS episode_{column} ON episode_index({column})"
+                )
+
+    def add(self, segment: str, offset: int, length: int, fields: dict[str, Any]) -> None:
+        success = fields.get("success")
+        with self._lock, self._con:
+            self._con.execute(
+                "INSERT INTO episode_index VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    segment,
+                    offset,
+                    length,
+                    fields.get("task_id"),
+                    int(success) if isinstance(success, bool) else None,
+                    _epoch(fields.get("timestamp")),
+                ),
+            )
+
+    def rename_segment(self, old: str, new: str) -> None:
+        with self._lock, self._con:
+            self._con.execute(
+                "UPDATE episode_index SET segment = ? WHERE segment = ?", (new, old)
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._con:
+            self._con.execute("DELETE FROM episode_index")
+
+    def lookup(
+            self,
+            task_id: str | None = None,
+            success: bool | None = None,
+            since: float | None = None,
+            until: float | None = None,
+            limit: int | None = None,
+            ) -> list[tuple[str, int, int]]:
+        clauses: list[str] = []
+        params: list[Any] = []
+        if task_id is not None:
+            clauses.append("task_id = ?")
+            params.append(task_id)
+        if success is not None:
+            clauses.append("success = ?")
+            params.append(int(success))
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        # Newest ``limit`` matches, returned oldest first like the log itself.
+        sql = f"SELECT segment, offset, length FROM episode_index {where} ORDER BY rowid DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._con.execute(sql, params).fetchall()
+        return rows[::-1]
+
+    def close(self) -> None:
+        with self._lock:
+            self._con.close()
 
 
 class EpisodicMemory:
-    def __init__(self, episodes_path: str = "audit/episodes.jsonl") -> None:
+    """Append-only episode log split into rotated segments.
+
+    The active file is ``episodes_path``. Once it exceeds ``max_segment_bytes``
+    or ``max_segment_age_s`` it is renamed to ``<stem>.<n>.jsonl`` (gzip
+    compressed when ``compress`` is set) and listed in ``<stem>.manifest.json``.
+    Writes go through one buffered handle that is flushed every
+    ``flush_every`` lines (and fsynced when ``fsync`` is set).
+    Recent reads tail the active file from the end and only seek into closed
+    segments (through the index) when it holds fewer lines than requested. Every line is also
+    recorded in an :class:`EpisodeIndex` (``<stem>.index.db``) so ``query``
+    can seek straight to matching episodes.
+    """
+
+    def __init__(
+            self,
+            episodes_path: str | Path = "audit/episodes.jsonl",
+            max_segment_bytes: int | None = 64 * 1024 * 1024,
+            max_segment_age_s: float | None = None,
+            compress: bool = True,
+            flush_every: int = 1,
+            fsync: bool = False,
+            ) -> None:
         self.path = Path(episodes_path)
         self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age_s = max_segment_age_s
+        self.compress = compress
+        self.flush_every = max(1, flush_every)
+        self.fsync = fsync
+        self._handle: IO[bytes] | None = None
+        self._unflushed = 0
+        self._lock = threading.RLock()
+        self.manifest_path = self.path.with_name(f"{self.path.stem}.manifest.json")
+        self._manifest = self._load_manifest()
+        self.index = EpisodeIndex(self.path.with_name(f"{self.path.stem}.index.db"))
+        if self.index.created:
+            self.reindex()
+
+    def _load_manifest(self) -> dict[str, Any]:
+        if self.manifest_path.exists():
+            try:
+                return json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                pass
+        return {"active_since": time.time(), "segments": []}
 
-    def append_line(self, line: str) -> None:
-        with open(self.path, "a", encoding="utf-8") as f:
-            f.write(line.rstrip() + "\n")
+    def _save_manifest(self) -> None:
+        atomic_write_text(self.manifest_path, json.dumps(self._manifest, indent=2))
 
-    def load_recent(self, limit: int = 20) -> list[dict[str, Any]]:
+    @property
+    def segments(self) -> list[Path]:
+        """Closed segments, oldest first."""
+        return [self.path.with_name(s["file"]) for s in self._manifest["segments"]]
+
+    def _should_rotate(self) -> bool:
         if not self.path.exists():
-            return []
-        lines = self.path.read_text(encoding="utf-8").splitlines()
-        lines = lines[-limit:]
-        out: list[dict[str, Any]] = []
-        for ln in lines:
+            return False
+        if self.max_segment_bytes is not None:
+            if self.path.stat().st_size >= self.max_segment_bytes:
+                return True
+        if self.max_segment_age_s is not None:
+            if time.time() - self._manifest["active_since"] >= self.max_segment_age_s:
+                return True
+        return False
+
+    def rotate(self) -> Path | None:
+        """Close the active file as a new segment; returns its path."""
+        self._close_handle()
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return None
+        n = len(self._manifest["segments"]) + 1
+        closed = self.path.with_name(f"{self.path.stem}.{n:06d}{self.path.suffix}")
+        os.replace(self.path, closed)
+        if self.compress:
+            gz = closed.with_name(closed.name + ".gz")
+            with open(closed, "rb") as src, gzip.open(gz, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            closed.unlink()
+            closed = gz
+        self._manifest["segments"].append(
+            {"file": closed.name, "bytes": closed.stat().st_size, "closed_at": time.time()}
+        )
+        self._manifest["active_since"] = time.time()
+        self._save_manifest()
+        self.index.rename_segment("", closed.name)
+        return closed
+
+    def append_line(self, line: str, fields: dict[str, Any] | None = None) -> None:
+        """Append one JSON line; ``fields`` (task_id/success/timestamp) skip re-parsing it."""
+        data = (line.rstrip() + "\n").encode("utf-8")
+        if fields is None:
             try:
-                out.append(json.loads(ln))
+                fields = json.loads(data)
             except json.JSONDecodeError:
-                continue
+                fields = {}
+        with self._lock:
+            if self._should_rotate():
+                self.rotate()
+            if self._handle is None:
+                self._handle = open(self.path, "ab")
+            offset = self._handle.tell()
+            self._handle.write(data)
+            self._unflushed += 1
+            if self._unflushed >= self.flush_every:
+                self.flush()
+            self.index.add("", offset, len(data), fields)
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._handle is None or self._unflushed == 0:
+                return
+            self._handle.flush()
+            if self.fsync:
+                os.fsync(self._handle.fileno())
+            self._unflushed = 0
+
+    def _close_handle(self) -> None:
+        if self._handle is not None:
+            self.flush()
+            self._handle.close()
+            self._handle = None
+
+    def _open_segment(self, name: str) -> IO[bytes]:
+        if not name:
+            self.flush()
+            return open(self.path, "rb")
+        seg = self.path.with_name(name)
+        return gzip.open(seg, "rb") if seg.suffix == ".gz" else open(seg, "rb")
+
+    def query(
+            self,
+            task_id: str | None = None,
+            success: bool | None = None,
+            since: datetime | float | None = None,
+            until: datetime | float | None = None,
+            limit: int | None = None,
+            ) -> list[dict[str, Any]]:
+        """Episodes matching all given filters, oldest first (newest ``limit`` if set)."""
+        hits = self.index.lookup(task_id, success, _epoch(since), _epoch(until), limit)
+        out: list[dict[str, Any]] = []
+        for name, group in itertools.groupby(hits, key=lambda h: h[0]):
+            with self._open_segment(name) as f:
+                for _, offset, length in group:
+                    f.seek(offset)
+                    out.extend(_parse_lines([f.read(length).decode("utf-8")]))
         return out
 
+    def close(self) -> None:
+        self._close_handle()
+        self.index.close()
+
+    def reindex(self) -> None:
+        """Rebuild the sidecar index by scanning every segment and the active file."""
+        self.index.clear()
+        for name in [seg.name for seg in self.segments] + [""]:
+            if not name and not self.path.exists():
+                continue
+            with self._open_segment(name) as f:
+                offset = 0
+                for raw in f:
+                    try:
+                        fields = json.loads(raw)
+                    except json.JSONDecodeError:
+                        fields = {}
+                    self.index.add(name, offset, len(raw), fields)
+                    offset += len(raw)
+
+    def load_recent(self, limit: int = 20) -> list[dict[str, Any]]:
+        self.flush()
+        lines = _tail_lines(self.path, limit)
+        if len(lines) >= limit or not self.segments:
+            return _parse_lines(lines)
+        # Short active file (e.g. just rotated): seek to the newest lines by index
+        # rather than decompressing whole segments into memory.
+        return self.query(limit=limit)
+
+
+DEFAULT_RECALL_FIELDS: tuple[str, ...] = ("id", "text", "tags", "metadata")
+
+
+def _as_dict(record: Any, fields: Sequence[str]) -> dict[str, Any]:
+    return {"id": record.id, **{f: getattr(record, f) for f in fields if f != "id"}}
+
 
 @dataclass
 class MemorySystem:
     stm: ShortTermMemory
     episodic: EpisodicMemory
     ltm: SQLiteMemoryStore
+    # When set, long-term writes are queued and committed in the background.
+    writer: WriteBehindWriter | None = None
+    # Called with the record dicts of every long-term write (e.g. cache invalidation).
+    write_listeners: list[Callable[[list[dict[str, Any]]], None]] = field(default_factory=list)
+
+    def add_write_listener(self, listener: Callable[[list[dict[str, Any]]], None]) -> None:
+        self.write_listeners.append(listener)
+
+    def remove_write_listener(self, listener: Callable[[list[dict[str, Any]]], None]) -> None:
+        """Stop calling ``listener``; a no-op if it is not registered."""
+        if listener in self.write_listeners:
+            self.write_listeners.remove(listener)
+
+    def enable_write_behind(self, **kwargs: Any) -> None:
+        if self.writer is None:
+            self.writer = WriteBehindWriter(self.ltm, **kwargs)
+
+    def flush(self) -> None:
+        """Block until every queued long-term write is committed."""
+        if self.writer is not None:
+            self.writer.flush()
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        self.stm.close()
+        self.episodic.close()
+        self.ltm.close()
+
+    def _sync_reads(self) -> None:
+        # Read-your-writes: recall never runs ahead of queued writes.
+        if self.writer is not None and self.writer.pending:
+            self.writer.flush()
 
     def add_to_stm(self, kind: str, content: str, meta: dict[str, Any] | None = None) -> None:
         self.stm.add({"kind": kind, "content": content, "meta": meta or {}})
@@ -73,8 +481,102 @@ class MemorySystem:
             tags: list[str] | None = None, 
             metadata: dict[str, Any] | None = None
             ) -> None:
-        self.ltm.add_text(record_id=record_id, text=text, tags=tags, metadata=metadata)
+        self.remember_long_term_many(
+            [{"record_id": record_id, "text": text, "tags": tags, "metadata": metadata}]
+        )
+
+    def remember_long_term_many(self, records: Iterable[dict[str, Any]]) -> int:
+        """Store several records in one transaction (or queue them, in write-behind mode).
+
+        Each item takes the keyword arguments of ``remember_long_term``
+        (``record_id``, ``text`` and optional ``tags`` / ``metadata``).
+        """
+        items = list(records)
+        if self.writer is not None:
+            self.writer.submit(items)
+            written = len(items)
+        else:
+            written = self.ltm.add_texts(items)
+        for listener in list(self.write_listeners):
+            listener(items)
+        return written
+
+    def recall_long_term(
+            self,
+            query: str,
+            limit: int = 5,
+            tags: list[str] | None = None,
+            task_id: str | None = None,
+            source: str | None = None,
+            success: bool | None = None,
+            fields: Sequence[str] = DEFAULT_RECALL_FIELDS,
+            ) -> list[dict[str, Any]]:
+        """Keyword recall, optionally restricted by tags and indexed metadata.
+
+        With filters but a blank query this returns the newest matching records.
+        Only ``fields`` are selected and decoded (``id`` is always included).
+        """
+        filters = MemoryFilter(tags=tags or [], task_id=task_id, source=source, success=success)
+        self._sync_reads()
+        if query.strip():
+            recs = self.ltm.search(query=query, limit=limit, filters=filters, columns=fields)
+        elif filters.to_sql()[0]:
+            recs = self.ltm.recent(limit=limit, filters=filters, columns=fields)
+        else:
+            recs = []
+        return [_as_dict(r, fields) for r in recs]
+
+    def recall_passages(
+            self,
+            query: str,
+            limit: int = 5,
+            tags: list[str] | None = None,
+            task_id: str | None = None,
+            source: str | None = None,
+            success: bool | None = None,
+            ) -> list[PassageHit]:
+        """Keyword recall at passage level: best-matching windows of long records."""
+        filters = MemoryFilter(tags=tags or [], task_id=task_id, source=source, success=success)
+        self._sync_reads()
+        return self.ltm.search_passages(query=query, limit=limit, filters=filters)
+
+    def recall_semantic_passages(self, query: str, limit: int = 5) -> list[PassageHit]:
+        """Embedding recall, narrowed to each record's passage sharing most query terms.
+
+        ``score`` is the record-level cosine similarity.
+        """
+        hits = self.recall_semantic(query=query, limit=limit, fields=("id",))
+        by_record = self.ltm.passages([h["id"] for h in hits])
+        terms = set(tokenize(query))
+        out: list[PassageHit] = []
+        for h in hits:
+            candidates = by_record.get(h["id"])
+            if not candidates:
+                continue
+            best = max(
+                candidates, key=lambda p: (len(terms.intersection(tokenize(p.text))), -p.index)
+            )
+            best.score = h["score"]
+            out.append(best)
+        return out
+
+    def recall_by_vector(
+            self,
+            query_vec: list[float],
+            limit: int = 5,
+            fields: Sequence[str] = DEFAULT_RECALL_FIELDS,
+            ) -> list[dict[str, Any]]:
+        self._sync_reads()
+        hits = self.ltm.search_vector(query_vec=query_vec, k=limit, columns=fields)
+        return [{**_as_dict(r, fields), "score": score} for r, score in hits]
 
-    def recall_long_term(self, query: str, limit: int = 5) -> list[dict[str, Any]]:
-        recs = self.ltm.search(query=query, limit=limit)
-        return [{"id": r.id, "text": r.text, "tags": r.tags, "metadata": r.metadata} for r in recs]
+    def recall_semantic(
+            self,
+            query: str,
+            limit: int = 5,
+            fields: Sequence[str] = DEFAULT_RECALL_FIELDS,
+            ) -> list[dict[str, Any]]:
+        """Embedding-based recall; empty when the store has no embedder."""
+        self._sync_reads()
+        hits = self.ltm.search_semantic(query=query, k=limit, columns=fields)
+        return [{**_as_dict(r, fields), "score": score} for r, score in hits]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 from collections import deque
 from dataclasses import dataclass, field
 
@@ -22,17 +23,20 @@ class QualityMonitor:
     def __init__(self, cfg: MonitorConfig | None = None) -> None:
         self.cfg = cfg or MonitorConfig()
         self.state = MonitorState()
+        # Shared by concurrently running tasks, whose queries and scores interleave.
+        self._lock = threading.Lock()
 
     def observe_query(self, q: str) -> bool:
         q_norm = q.strip().lower()
-        self.state.last_queries.append(q_norm)
-        count = sum(1 for x in self.state.last_queries if x == q_norm)
+        with self._lock:
+            self.state.last_queries.append(q_norm)
+            count = sum(1 for x in self.state.last_queries if x == q_norm)
         return count > self.cfg.repeated_query_limit
 
     def observe_score(self, score: float) -> bool:
-        
-        if score < self.cfg.low_score_threshold:
-            self.state.low_score_streak += 1
-        else:
-            self.state.low_score_streak = 0
-        return self.state.low_score_streak >= self.cfg.low_score_streak_limit
+        with self._lock:
+            if score < self.cfg.low_score_threshold:
+                self.state.low_score_streak += 1
+            else:
+                self.state.low_score_streak = 0
+            return self.state.low_score_streak >= self.cfg.low_score_streak_limit
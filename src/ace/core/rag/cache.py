@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING
+
+from ace.core.embedding import Embedder
+from ace.core.rag.models import RetrievedChunk
+from ace.core.text import normalize_text, tokenize
+from ace.core.vector_index import VectorIndex
+
+if TYPE_CHECKING:
+    from ace.core.rag.pipeline import RAGResult
+
+CacheKey = tuple[str, str, int]
+
+
+@dataclass
+class _Entry:
+    chunks: list[RetrievedChunk]
+    expires_at: float
+    terms: frozenset[str] = field(default_factory=frozenset)
+
+
+class RetrievalCache:
+    """LRU cache of retriever results keyed by ``(normalized query, retriever, limit)``.
+
+    Entries expire after the TTL configured for their retriever
+    (``ttls[name]``, else ``default_ttl_s``). ``invalidate_matching`` drops
+    entries of the given sources whose query shares a term with newly written
+    text, which is how internal-memory results are kept in step with LTM
+    writes; the short internal TTL bounds staleness from semantic neighbours.
+    """
+
+    def __init__(
+            self,
+            max_items: int = 512,
+            ttls: dict[str, float] | None = None,
+            default_ttl_s: float = 300.0,
+            clock: Callable[[], float] = time.monotonic,
+            ) -> None:
+        self.max_items = max_items
+        self.ttls = {"web": 900.0, "internal": 60.0, **(ttls or {})}
+        self.default_ttl_s = default_ttl_s
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[CacheKey, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(query: str, retriever: str, limit: int) -> CacheKey:
+        return normalize_text(query), retriever, limit
+
+    def get(self, query: str, retriever: str, limit: int) -> list[RetrievedChunk] | None:
+        key = self.key(query, retriever, limit)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= self.clock():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry.chunks)
+
+    def put(
+            self, query: str, retriever: str, limit: int, chunks: list[RetrievedChunk]
+            ) -> None:
+        key = self.key(query, retriever, limit)
+        ttl = self.ttls.get(retriever, self.default_ttl_s)
+        entry = _Entry(list(chunks), self.clock() + ttl, frozenset(tokenize(query)))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def invalidate_matching(
+            self, texts: Iterable[str], sources: Iterable[str], keep: Iterable[str] = ()
+            ) -> int:
+        """Drop entries from ``sources`` whose query terms appear in any of ``texts``.
+
+        Entries for the queries in ``keep`` survive regardless.
+        """
+        sources = set(sources)
+        kept = {normalize_text(q) for q in keep}
+        written: set[str] = set()
+        for text in texts:
+            written.update(tokenize(text))
+        with self._lock:
+            stale = [
+                k for k, e in self._entries.items()
+                if k[1] in sources and k[0] not in kept and not e.terms.isdisjoint(written)
+            ]
+            for k in stale:
+                del self._entries[k]
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+        }
+
+
+@dataclass
+class _Answer:
+    result: RAGResult
+    created_at: float
+    terms: frozenset[str] = field(default_factory=frozenset)
+
+
+class AnswerCache:
+    """Whole-answer cache in front of ``RAGPipeline.run``.
+
+    A query hits when its normalized text was answered before, or (with an
+    ``embedder``) when a previous query with the same ``limit`` and the same
+    set of words has cosine similarity of at least ``similarity``; vectors
+    alone cannot tell queries about different entities apart. Either way the cached answer must
+    be younger than ``max_age_s``. A hit is a copy re-stamped with the asking
+    query. ``invalidate_matching`` drops answers whose query shares a term
+    with newly written text. Bounded LRU; ``stats()`` counts exact and
+    semantic hits, misses, stale entries dropped and invalidations.
+    """
+
+    def __init__(
+            self,
+            embedder: Embedder | None = None,
+            similarity: float = 0.92,
+            max_age_s: float = 3600.0,
+            max_items: int = 256,
+            clock: Callable[[], float] = time.monotonic,
+            ) -> None:
+        self.embedder = embedder
+        self.similarity = similarity
+        self.max_age_s = max_age_s
+        self.max_items = max_items
+        self.clock = clock
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[str, _Answer] = OrderedDict()
+        self._vectors = VectorIndex()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(query: str, limit: int) -> str:
+        return f"{limit}:{normalize_text(query)}"
+
+    def _fresh(self, key: str) -> _Answer | None:
+        entry = self._entries.get(key)
+        if entry is not None and self.clock() - entry.created_at > self.max_age_s:
+            self._drop(key)
+            self.stale += 1
+            return None
+        return entry
+
+    def _drop(self, key: str) -> None:
+        del self._entries[key]
+        self._vectors.remove(key)
+
+    def get(self, query: str, limit: int) -> RAGResult | None:
+        key = self._key(query, limit)
+        vec = self.embedder.embed(query) if self.embedder is not None else None
+        terms = frozenset(tokenize(query))
+        with self._lock:
+            entry = self._fresh(key)
+            if entry is not None:
+                self.exact_hits += 1
+            elif vec is not None:
+                for other, score in self._vectors.search(vec, k=5):
+                    if score < self.similarity:
+                        break
+                    if not other.startswith(f"{limit}:"):
+                        continue
+                    candidate = self._fresh(other)
+                    if candidate is not None and candidate.terms == terms:
+                        entry, key = candidate, other
+                        self.semantic_hits += 1
+                        break
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            cached = entry.result
+        # A semantic hit answers a different wording; never hand out shared lists.
+        return replace(
+            cached,
+            query=query,
+            fused=list(cached.fused),
+            dropped=dict(cached.dropped),
+            cached=True,
+        )
+
+    def put(self, query: str, limit: int, result: RAGResult) -> None:
+        key = self._key(query, limit)
+        vec = self.embedder.embed(query) if self.embedder is not None else None
+        with self._lock:
+            self._entries[key] = _Answer(result, self.clock(), frozenset(tokenize(query)))
+            self._entries.move_to_end(key)
+            if vec is not None:
+                self._vectors.upsert(key, vec)
+            while len(self._entries) > self.max_items:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_matching(self, texts: Iterable[str], keep: Iterable[str] = ()) -> int:
+        """Drop answers whose query terms appear in any of ``texts``, except for ``keep``."""
+        kept = {normalize_text(q) for q in keep}
+        written: set[str] = set()
+        for text in texts:
+            written.update(tokenize(text))
+        with self._lock:
+            stale = [
+                k for k, e in self._entries.items()
+                if k.split(":", 1)[1] not in kept and not e.terms.isdisjoint(written)
+            ]
+            for key in stale:
+                self._drop(key)
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.exact_hits + self.semantic_hits,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+        }
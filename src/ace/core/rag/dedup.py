@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import random
+import zlib
+from collections import defaultdict
+from collections.abc import Sequence
+
+from ace.core.rag.models import RetrievedChunk
+from ace.core.text import tokenize
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+_PRIME = (1 << 31) - 1
+
+
+def shingles(text: str, size: int = 5) -> set[int]:
+    """crc32 hashes of character ``size``-grams over the word tokens of ``text``.
+
+    Tokenizing first makes case, punctuation and spacing differences vanish.
+    """
+    norm = " ".join(tokenize(text))
+    if len(norm) <= size:
+        return {zlib.crc32(norm.encode("utf-8"))} if norm else set()
+    return {zlib.crc32(norm[i : i + size].encode("utf-8")) for i in range(len(norm) - size + 1)}
+
+
+def jaccard(a: set[int], b: set[int]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """MinHash signatures from ``num_perm`` universal hashes ``(a*x + b) mod p``.
+
+    Coefficients come from a seeded RNG so signatures are stable across runs.
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1) -> None:
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._a = [rng.randrange(1, _PRIME) for _ in range(num_perm)]
+        self._b = [rng.randrange(0, _PRIME) for _ in range(num_perm)]
+        if np is not None:
+            self._a_np = np.asarray(self._a, dtype=np.uint64)[:, None]
+            self._b_np = np.asarray(self._b, dtype=np.uint64)[:, None]
+
+    def signature(self, features: set[int]) -> tuple[int, ...]:
+        if not features:
+            return (_PRIME,) * self.num_perm
+        if np is not None:
+            x = np.fromiter((f % _PRIME for f in features), dtype=np.uint64, count=len(features))
+            return tuple((((self._a_np * x) + self._b_np) % _PRIME).min(axis=1).tolist())
+        xs = [f % _PRIME for f in features]
+        return tuple(
+            min((a * x + b) % _PRIME for x in xs)
+            for a, b in zip(self._a, self._b, strict=True)
+        )
+
+
+class NearDuplicateFilter:
+    """Collapse near-duplicate chunks, keeping the highest-confidence copy.
+
+    Chunks are shingled and MinHashed; LSH banding (``bands`` x ``rows``
+    signature slices) buckets likely-similar chunks so only colliding pairs
+    are compared, which keeps large candidate sets sub-quadratic. Colliding
+    pairs count as duplicates when their shingle Jaccard similarity is at
+    least ``threshold``. The default 16 bands of 4 rows find pairs at 0.8
+    similarity with probability > 0.999.
+    """
+
+    def __init__(
+            self,
+            threshold: float = 0.8,
+            num_perm: int = 64,
+            bands: int = 16,
+            shingle_size: int = 5,
+            ) -> None:
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.hasher = MinHasher(num_perm)
+
+    def filter(self, chunks: Sequence[RetrievedChunk]) -> list[RetrievedChunk]:
+        """Return one chunk per near-duplicate cluster, in input order."""
+        return [chunks[group[0]] for group in self.clusters(chunks)]
+
+    def clusters(self, chunks: Sequence[RetrievedChunk]) -> list[list[int]]:
+        """Indices of each near-duplicate cluster, most confident chunk first.
+
+        Clusters are ordered by the position of that kept chunk.
+        """
+        n = len(chunks)
+        if n < 2:
+            return [[i] for i in range(n)]
+        feats = [shingles(ch.text, self.shingle_size) for ch in chunks]
+        parent = list(range(n))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        buckets: dict[tuple[int, tuple[int, ...]], list[int]] = defaultdict(list)
+        for i, f in enumerate(feats):
+            sig = self.hasher.signature(f)
+            for band in range(self.bands):
+                buckets[band, sig[band * self.rows : (band + 1) * self.rows]].append(i)
+
+        checked: set[tuple[int, int]] = set()
+        for members in buckets.values():
+            for pos, i in enumerate(members):
+                for j in members[pos + 1 :]:
+                    if (i, j) in checked:
+                        continue
+                    checked.add((i, j))
+                    ri, rj = find(i), find(j)
+                    if ri != rj and jaccard(feats[i], feats[j]) >= self.threshold:
+                        parent[max(ri, rj)] = min(ri, rj)
+
+        groups: dict[int, list[int]] = defaultdict(list)
+        for i in range(n):
+            groups[find(i)].append(i)
+        out: list[list[int]] = []
+        for members in groups.values():
+            # max() keeps the first of equally confident copies.
+            keep = max(members, key=lambda i: chunks[i].citation.confidence)
+            out.append([keep, *(i for i in members if i != keep)])
+        return sorted(out, key=lambda group: group[0])
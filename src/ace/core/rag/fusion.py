@@ -1,32 +1,285 @@
 from __future__ import annotations
 
-import hashlib
-from dataclasses import dataclass
+import heapq
+import math
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import asdict, dataclass, field, replace
+from itertools import groupby
+from typing import Any, Protocol
 
+from ace.core.chunking import sentence_spans
+from ace.core.rag.dedup import NearDuplicateFilter
 from ace.core.rag.models import RetrievedChunk
+from ace.core.text import fingerprint, tokenize
 
 
-def _fingerprint(text: str) -> str:
-    return hashlib.sha256(text.strip().lower().encode("utf-8")).hexdigest()
+def _raw_scores(chunks: Sequence[RetrievedChunk]) -> list[float]:
+    # Lists without native scores on every chunk (keyword hits, web results,
+    # keyword + semantic top-ups) fall back to a rank proxy that keeps order.
+    if all(ch.score is not None for ch in chunks):
+        return [ch.score for ch in chunks]  # type: ignore[misc]
+    return [1.0 / rank for rank in range(1, len(chunks) + 1)]
+
+
+class FusionStrategy(Protocol):
+    """Scores one retriever's ranked result list (best first).
+
+    ``combine`` says how scores of the same chunk from several sources merge:
+    ``"sum"`` (CombSUM, RRF) or ``"max"``.
+    """
+
+    combine: str
+
+    def scores(self, chunks: Sequence[RetrievedChunk]) -> list[float]: ...
+
+
+class ConfidenceFusion:
+    """Rank by the citation's per-source confidence (the original behaviour)."""
+
+    combine = "max"
+
+    def scores(self, chunks: Sequence[RetrievedChunk]) -> list[float]:
+        return [ch.citation.confidence for ch in chunks]
+
+
+@dataclass
+class ReciprocalRankFusion:
+    """RRF: ``1 / (k + rank)``; ignores score scales entirely."""
+
+    k: int = 60
+    combine: str = "sum"
+
+    def scores(self, chunks: Sequence[RetrievedChunk]) -> list[float]:
+        return [1.0 / (self.k + rank) for rank in range(1, len(chunks) + 1)]
+
+
+class MinMaxFusion:
+    """Rescale each retriever's scores to [0, 1]; a flat list scores 1.0."""
+
+    combine = "sum"
+
+    def scores(self, chunks: Sequence[RetrievedChunk]) -> list[float]:
+        raw = _raw_scores(chunks)
+        if not raw:
+            return []
+        lo, hi = min(raw), max(raw)
+        if hi == lo:
+            return [1.0] * len(raw)
+        return [(x - lo) / (hi - lo) for x in raw]
+
+
+class ZScoreFusion:
+    """Standardize each retriever's scores; a flat list scores 0.0."""
+
+    combine = "sum"
+
+    def scores(self, chunks: Sequence[RetrievedChunk]) -> list[float]:
+        raw = _raw_scores(chunks)
+        if not raw:
+            return []
+        mean = sum(raw) / len(raw)
+        std = math.sqrt(sum((x - mean) ** 2 for x in raw) / len(raw))
+        if std == 0:
+            return [0.0] * len(raw)
+        return [(x - mean) / std for x in raw]
+
+
+@dataclass
+class _Candidate:
+    chunk: RetrievedChunk
+    score: float
+    order: tuple[int, int]
+
+
+class FusionAccumulator:
+    """Incremental fusion: feed each retriever's list as it arrives, then take ``top``.
+
+    Copies with the same content fingerprint are merged: their weighted
+    scores combine per ``strategy.combine`` and the most confident copy is kept.
+    Near-duplicates (``fusion.near_duplicates``) are merged the same way when
+    results are taken, so agreement between sources still raises the rank.
+    """
+
+    def __init__(self, fusion: RAGFusion) -> None:
+        self.fusion = fusion
+        self._candidates: dict[str, _Candidate] = {}
+        self._batches = 0
+
+    def add(
+            self, source: str, chunks: Sequence[RetrievedChunk], position: int | None = None
+            ) -> None:
+        """Add one retriever's ranked results; ``position`` orders ties between sources."""
+        pos = self._batches if position is None else position
+        self._batches += 1
+        weight = self.fusion.weights.get(source, 1.0)
+        for rank, (ch, s) in enumerate(
+            zip(chunks, self.fusion.strategy.scores(chunks), strict=True)
+        ):
+            fp = fingerprint(ch.text)
+            cand = self._candidates.get(fp)
+            if cand is None:
+                self._candidates[fp] = _Candidate(ch, weight * s, (pos, rank))
+                continue
+            cand.score = self._combine(cand.score, weight * s)
+            if ch.citation.confidence > cand.chunk.citation.confidence:
+                cand.chunk = ch
+
+    def _combine(self, a: float, b: float) -> float:
+        return max(a, b) if self.fusion.strategy.combine == "max" else a + b
+
+    def _deduplicated(self) -> Iterable[_Candidate]:
+        cands = list(self._candidates.values())
+        if self.fusion.near_duplicates is None:
+            return cands
+        merged: list[_Candidate] = []
+        for keep, *rest in self.fusion.near_duplicates.clusters([c.chunk for c in cands]):
+            score = cands[keep].score
+            for i in rest:
+                score = self._combine(score, cands[i].score)
+            merged.append(_Candidate(cands[keep].chunk, score, cands[keep].order))
+        return merged
+
+    def top_scored(self, k: int | None = None) -> list[tuple[float, RetrievedChunk]]:
+        k = self.fusion.max_chunks if k is None else k
+        # Bounded heap: O(n log k) rather than sorting every candidate.
+        best = heapq.nlargest(
+            k, self._deduplicated(), key=lambda c: (c.score, -c.order[0], -c.order[1])
+        )
+        return [(c.score, c.chunk) for c in best]
+
+    def top(self, k: int | None = None) -> list[RetrievedChunk]:
+        return self.select(k)[0]
+
+    def select(self, k: int | None = None) -> tuple[list[RetrievedChunk], BudgetReport | None]:
+        """Top chunks, packed into ``fusion.budget`` when one is set.
+
+        Without a budget this is ``top_scored`` and the report is None. With
+        one, every candidate competes on score per unit of length (greedy
+        knapsack, at most ``k`` chunks); a chunk that does not fit is cut
+        after its last whole sentence that does, or skipped. The result is in
+        score order and the report records every decision.
+        """
+        fusion = self.fusion
+        k = fusion.max_chunks if k is None else k
+        if fusion.budget is None:
+            return [ch for _, ch in self.top_scored(k)], None
+
+        cands = sorted(self._deduplicated(), key=lambda c: (-c.score, c.order))
+        floor = min((c.score for c in cands), default=0.0)
+        # Densities need non-negative relevance (z-scores can be negative).
+        shift = -floor if floor < 0 else 0.0
+        size = fusion.measure
+        by_density = sorted(
+            range(len(cands)),
+            key=lambda i: -(cands[i].score + shift) / max(1, size(cands[i].chunk.text)),
+        )
+
+        report = BudgetReport(budget=fusion.budget, unit=fusion.budget_unit)
+        chosen: dict[int, RetrievedChunk] = {}
+        decisions: dict[int, SelectionEntry] = {}
+        for i in by_density:
+            ch = cands[i].chunk
+            length = size(ch.text)
+            entry = SelectionEntry(
+                source=ch.citation.source,
+                source_id=ch.citation.source_id,
+                score=round(cands[i].score, 6),
+                length=length,
+            )
+            decisions[i] = entry
+            room = fusion.budget - report.used
+            if len(chosen) >= k or room <= 0:
+                entry.decision = "skipped"
+                continue
+            if length <= room:
+                chosen[i] = ch
+                entry.decision, entry.used = "kept", length
+            else:
+                cut = _truncate(ch, room, size)
+                if cut is None:
+                    entry.decision = "skipped"
+                    continue
+                chosen[i] = cut
+                entry.decision, entry.used = "truncated", size(cut.text)
+            report.used += entry.used
+
+        report.entries = [decisions[i] for i in range(len(cands))]
+        return [chosen[i] for i in sorted(chosen)], report
+
+
+@dataclass
+class SelectionEntry:
+    source: str
+    source_id: str
+    score: float
+    length: int
+    used: int = 0
+    decision: str = ""  # "kept", "truncated" or "skipped"
+
+
+@dataclass
+class BudgetReport:
+    """Audit trail of a budgeted fusion: what was kept, cut or skipped, in score order."""
+
+    budget: int
+    unit: str
+    used: int = 0
+    entries: list[SelectionEntry] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _truncate(
+        chunk: RetrievedChunk, room: int, size: Callable[[str], int]
+        ) -> RetrievedChunk | None:
+    """Cut ``chunk`` after its last whole sentence that fits in ``room``; None if none does."""
+    end = None
+    for _, e in sentence_spans(chunk.text):
+        if size(chunk.text[:e]) > room:
+            break
+        end = e
+    if end is None or end >= len(chunk.text.rstrip()):
+        return None
+    text = chunk.text[:end]
+    c = chunk.citation
+    # Keep the part of the snippet inside the kept text; web snippets follow a
+    # title, so locate it rather than assume it is a prefix.
+    at = chunk.text.find(c.snippet) if c.snippet else -1
+    snippet = c.snippet[: max(0, end - at)] if at >= 0 else text[: len(c.snippet)]
+    citation = replace(
+        c,
+        snippet=snippet,
+        end=c.start + end if c.start is not None else None,
+    )
+    return replace(chunk, text=text, citation=citation)
 
 
 @dataclass
 class RAGFusion:
     max_chunks: int = 8
+    # None disables the near-duplicate stage; tune its ``threshold`` to taste.
+    near_duplicates: NearDuplicateFilter | None = field(default_factory=NearDuplicateFilter)
+    strategy: FusionStrategy = field(default_factory=ConfidenceFusion)
+    # Per-source multipliers applied to strategy scores (default 1.0).
+    weights: dict[str, float] = field(default_factory=dict)
+    # Optional size budget for the selected chunks, in characters or word tokens.
+    budget: int | None = None
+    budget_unit: str = "chars"
 
-    def fuse(self, chunks: list[RetrievedChunk]) -> list[RetrievedChunk]:
-        # Dedupe by content fingerprint
-        seen: set[str] = set()
-        deduped: list[RetrievedChunk] = []
-        for ch in chunks:
-            fp = _fingerprint(ch.text)
-            if fp in seen:
-                continue
-            seen.add(fp)
-            deduped.append(ch)
+    def __post_init__(self) -> None:
+        if self.budget_unit not in ("chars", "tokens"):
+            raise ValueError(f"budget_unit must be 'chars' or 'tokens', not {self.budget_unit!r}")
+
+    def measure(self, text: str) -> int:
+        return len(text) if self.budget_unit == "chars" else len(tokenize(text))
 
-        # Rank by confidence (desc)
-        deduped.sort(key=lambda c: c.citation.confidence, reverse=True)
+    def accumulator(self) -> FusionAccumulator:
+        return FusionAccumulator(self)
 
-        # Keep top-N
-        return deduped[: self.max_chunks]
+    def fuse(self, chunks: list[RetrievedChunk]) -> list[RetrievedChunk]:
+        # Consecutive chunks from one source form that retriever's ranked list.
+        acc = self.accumulator()
+        for source, group in groupby(chunks, key=lambda c: c.citation.source):
+            acc.add(source, list(group))
+        return acc.top()
@@ -12,6 +12,9 @@ class Citation:
     timestamp: str
     snippet: str
     confidence:float
+    # Character span of the cited passage within the source record, if known.
+    start: int | None = None
+    end: int | None = None
     def to_dict(self) -> dict[str, Any] :
         return asdict(self)
 
@@ -20,6 +23,8 @@ class Citation:
 class RetrievedChunk:
     text: str
     citation:Citation
+    # Retriever-native relevance (higher is better), when the retriever has one.
+    score: float | None = None
     def to_json(self) -> str:
         return json.dumps(
             {"text": self.text, "citation": self.citation.to_dict()},
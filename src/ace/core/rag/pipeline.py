@@ -1,56 +1,277 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 
-from ace.core.rag.fusion import RAGFusion
+from ace.core.rag.cache import AnswerCache, RetrievalCache
+from ace.core.rag.fusion import BudgetReport, RAGFusion
 from ace.core.rag.models import RetrievedChunk
+from ace.core.rag.retrievers import Retriever
+
+logger = logging.getLogger(__name__)
+
+# How often a fan-out re-checks calls still queued in the pool.
+_QUEUED_POLL_S = 0.05
 
 
 @dataclass
 class RAGResult:
-    answer: str
+    """Fused evidence for a query; the answer text is produced from it on demand.
+
+    ``lines()`` streams the answer without holding it; ``answer`` joins it on
+    first access (and keeps it) for callers that need the whole text.
+    """
+
     fused: list[RetrievedChunk]
+    # Retriever name -> why its results are missing ("timeout" or "error: ...").
+    dropped: dict[str, str] = field(default_factory=dict)
+    query: str = ""
+    # True when served by an AnswerCache rather than a fresh retrieval.
+    cached: bool = False
+    # How fused chunks were packed into RAGFusion.budget (None without a budget).
+    selection: BudgetReport | None = None
+    _answer: str | None = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def answer(self) -> str:
+        if self._answer is None:
+            self._answer = "\n".join(self.lines())
+        return self._answer
+
+    def lines(self) -> Iterator[str]:
+        """The answer generated line by line, for streaming writers."""
+        return synthesize_lines(self.query, self.fused)
+
+    def chunk_lines(self) -> Iterator[str]:
+        """One JSON document per fused chunk (the chunks.jsonl rows)."""
+        return (ch.to_json() for ch in self.fused)
 
 
 class RAGPipeline:
-    def __init__(self, 
-                 web_retriever, 
-                 internal_retriever, 
-                 fusion: RAGFusion | None = None
+    """Fan a query out to N retrievers concurrently and fuse what comes back.
+
+    Each retriever gets ``timeouts[name]`` seconds (default ``timeout_s``) and
+    the whole fan-out is capped by ``deadline_s``. A timeout starts when its
+    call actually begins and the deadline when the first call does, so time
+    queued behind other queries in the shared pool does not count against
+    them. A retriever that misses its
+    limit or raises is dropped and recorded in ``RAGResult.dropped``; fusion
+    goes ahead with the rest. Each list is fed to the fusion accumulator as it
+    arrives; ties between sources break by retriever position, so output
+    does not depend on timing. Retrievers run on one thread pool owned by the
+    pipeline (``max_workers`` threads, default four per retriever) that is
+    reused across calls; ``ensure_workers`` grows it for concurrent callers
+    and ``close`` shuts it down.
+
+    With a ``cache``, retrievers whose results are cached for the normalized
+    query are not called; only successful fresh results are cached. An
+    ``answer_cache`` short-circuits ``run`` for repeated or near-identical
+    queries; empty answers and answers with dropped sources are not cached.
+    """
+
+    def __init__(self,
+                 web_retriever: Retriever | None = None,
+                 internal_retriever: Retriever | None = None,
+                 fusion: RAGFusion | None = None,
+                 retrievers: Sequence[Retriever] = (),
+                 timeout_s: float | None = None,
+                 timeouts: dict[str, float] | None = None,
+                 deadline_s: float | None = None,
+                 cache: RetrievalCache | None = None,
+                 answer_cache: AnswerCache | None = None,
+                 max_workers: int | None = None,
                  ) -> None:
         self.web = web_retriever
         self.internal = internal_retriever
+        self.retrievers: list[Retriever] = [
+            r for r in (web_retriever, internal_retriever, *retrievers) if r is not None
+        ]
         self.fusion = fusion or RAGFusion()
+        self.timeout_s = timeout_s
+        self.timeouts = dict(timeouts or {})
+        self.deadline_s = deadline_s
+        self.cache = cache
+        self.answer_cache = answer_cache
+        self.max_workers = max_workers or 4 * max(1, len(self.retrievers))
+        self._pool: ThreadPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
 
-    def run(self, query: str, limit: int = 5) -> RAGResult:
-        web_chunks = self.web.retrieve(query=query, limit=limit)
-        internal_chunks = self.internal.retrieve(query=query, limit=limit)
-
-        fused = self.fusion.fuse(web_chunks + internal_chunks)
-        answer = self._synthesize(query, fused)
-        return RAGResult(answer=answer, fused=fused)
-
-    def _synthesize(self, query: str, fused: list[RetrievedChunk]) -> str:
-        if not fused:
-            return f"No evidence found for: {query}"
-
-        lines: list[str] = []
-        lines.append(f"Query: {query}")
-        lines.append("")
-        lines.append("Evidence-based notes:")
-        lines.append("")
-
-        for i, ch in enumerate(fused, start=1):
-            snippet = ch.text.replace("\n", " ").strip()
-            lines.append(f"- {snippet} [{i}]")
-
-        lines.append("")
-        lines.append("Citations:")
-        for i, ch in enumerate(fused, start=1):
-            c = ch.citation
-            lines.append(
-                f"[{i}] {c.source} | {c.source_id} | {c.timestamp} | "
-                f" conf={c.confidence:.2f}"
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="ace-retrieve"
                 )
+            return self._pool
+
+    def ensure_workers(self, callers: int) -> None:
+        """Size the pool for ``callers`` concurrent queries, so none queue behind another."""
+        needed = callers * max(1, len(self.retrievers))
+        with self._pool_lock:
+            if needed <= self.max_workers:
+                return
+            self.max_workers = needed
+            if self._pool is not None:
+                # Calls already running finish on the old pool.
+                self._pool.shutdown(wait=False)
+                self._pool = None
+
+    def close(self) -> None:
+        """Shut the retriever pool down without waiting for stragglers."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def __enter__(self) -> RAGPipeline:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _limit_for(self, retriever: Retriever, started: float, first: float) -> float:
+        timeout = self.timeouts.get(retriever.name, self.timeout_s)
+        limits = [
+            begin + t
+            for begin, t in ((started, timeout), (first, self.deadline_s))
+            if t is not None
+        ]
+        return min(limits, default=float("inf"))
+
+    def retrieve(
+            self, query: str, limit: int = 5
+            ) -> tuple[list[RetrievedChunk], dict[str, str]]:
+        """Run every retriever concurrently; return chunks and dropped sources."""
+        results: dict[int, list[RetrievedChunk]] = {}
+        dropped = self._fan_out(query, limit, results.__setitem__)
+        return [ch for i in sorted(results) for ch in results[i]], dropped
+
+    def _fan_out(
+            self,
+            query: str,
+            limit: int,
+            on_result: Callable[[int, list[RetrievedChunk]], None],
+            use_cache: bool = True,
+            ) -> dict[str, str]:
+        """Call ``on_result(retriever_index, chunks)`` as each retriever answers.
+
+        Returns the dropped sources. Without ``use_cache`` every retriever is
+        called; fresh results still refresh the cache.
+        """
+        dropped: dict[str, str] = {}
+        to_fetch: list[int] = []
+        for i, r in enumerate(self.retrievers):
+            cached = (
+                self.cache.get(query, r.name, limit)
+                if self.cache is not None and use_cache else None
+            )
+            if cached is None:
+                to_fetch.append(i)
+            else:
+                on_result(i, cached)
+        if not to_fetch:
+            return dropped
+
+        # Retriever index -> when its call began; set on the pool thread.
+        started: dict[int, float] = {}
+
+        def call(i: int) -> list[RetrievedChunk]:
+            started[i] = time.monotonic()
+            return self.retrievers[i].retrieve(query=query, limit=limit)
+
+        pool = self._executor()
+        pending: dict[Future[list[RetrievedChunk]], int] = {}
+        try:
+            for i in to_fetch:
+                pending[pool.submit(call, i)] = i
+            while pending:
+                now = time.monotonic()
+                begun = dict(started)  # snapshot; pool threads keep adding to it
+                first = min(begun.values(), default=now)
+                limits = {
+                    f: self._limit_for(self.retrievers[i], begun[i], first)
+                    for f, i in pending.items()
+                    if i in begun
+                }
+                for fut in [f for f in limits if limits[f] <= now and not f.done()]:
+                    fut.cancel()
+                    name = self.retrievers[pending.pop(fut)].name
+                    dropped[name] = "timeout"
+                    logger.warning("Retriever %r missed its deadline; fusing without it", name)
+                if not pending:
+                    break
+                nearest = min((limits[f] for f in pending if f in limits), default=float("inf"))
+                if len(limits) < len(pending):
+                    # Queued calls get their limits once they start; check back soon.
+                    nearest = min(nearest, now + _QUEUED_POLL_S)
+                timeout = None if nearest == float("inf") else max(0.0, nearest - now)
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    i = pending.pop(fut)
+                    name = self.retrievers[i].name
+                    try:
+                        chunks = fut.result()
+                    except Exception as exc:
+                        dropped[name] = f"error: {exc}"
+                        logger.warning("Retriever %r failed: %s", name, exc)
+                        continue
+                    if self.cache is not None:
+                        self.cache.put(query, name, limit, chunks)
+                    on_result(i, chunks)
+        finally:
+            # Don't wait for stragglers; their results are discarded.
+            for fut in pending:
+                fut.cancel()
+        return dropped
+
+    def run(self, query: str, limit: int = 5, bypass_cache: bool = False) -> RAGResult:
+        """Answer ``query``; ``bypass_cache`` forces fresh retrieval (and refreshes the caches)."""
+        if self.answer_cache is not None and not bypass_cache:
+            hit = self.answer_cache.get(query, limit)
+            if hit is not None:
+                return hit
+
+        # Fuse each retriever's list as it lands instead of after concatenation.
+        acc = self.fusion.accumulator()
+        dropped = self._fan_out(
+            query,
+            limit,
+            lambda i, chunks: acc.add(self.retrievers[i].name, chunks, position=i),
+            use_cache=not bypass_cache,
+        )
+        fused, selection = acc.select()
+        result = RAGResult(fused=fused, dropped=dropped, query=query, selection=selection)
+        # An answer without evidence, or missing a source, is not worth keeping.
+        if self.answer_cache is not None and fused and not dropped:
+            self.answer_cache.put(query, limit, result)
+        return result
+
+
+def synthesize_lines(query: str, fused: Sequence[RetrievedChunk]) -> Iterator[str]:
+    """Yield the evidence-based answer one line at a time (no trailing newlines)."""
+    if not fused:
+        yield f"No evidence found for: {query}"
+        return
+
+    yield f"Query: {query}"
+    yield ""
+    yield "Evidence-based notes:"
+    yield ""
+
+    for i, ch in enumerate(fused, start=1):
+        snippet = ch.text.replace("\n", " ").strip()
+        yield f"- {snippet} [{i}]"
 
-        return "\n".join(lines)
+    yield ""
+    yield "Citations:"
+    for i, ch in enumerate(fused, start=1):
+        c = ch.citation
+        span = f" | chars {c.start}-{c.end}" if c.start is not None else ""
+        yield (
+            f"[{i}] {c.source} | {c.source_id}{span} | {c.timestamp} | "
+            f" conf={c.confidence:.2f}"
+            )
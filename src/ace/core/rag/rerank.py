@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Sequence
+from dataclasses import replace
+
+from ace.core.embedding import Embedder
+from ace.core.rag.models import RetrievedChunk
+from ace.core.text import tokenize
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+
+class BatchReranker:
+    """Second-stage scorer for a wide candidate set.
+
+    All candidates are scored against the query in one pass from three
+    features: BM25 over the candidate set (IDF from the candidates
+    themselves), query-term coverage and, with an ``embedder``, cosine
+    similarity. The weighted mix lies in [0, 1] and becomes
+    ``RetrievedChunk.score``; ``Citation.confidence`` keeps the source's own
+    scale so it stays comparable with other retrievers.
+    """
+
+    def __init__(
+            self,
+            embedder: Embedder | None = None,
+            k1: float = 1.2,
+            b: float = 0.75,
+            bm25_weight: float = 0.5,
+            coverage_weight: float = 0.2,
+            cosine_weight: float = 0.3,
+            ) -> None:
+        self.embedder = embedder
+        self.k1 = k1
+        self.b = b
+        self.bm25_weight = bm25_weight
+        self.coverage_weight = coverage_weight
+        self.cosine_weight = cosine_weight
+
+    @staticmethod
+    def _term_matrix(
+            terms: list[str], docs: list[list[str]]
+            ) -> tuple[list[list[int]], list[int]]:
+        col = {t: j for j, t in enumerate(terms)}
+        tf = [[0] * len(terms) for _ in docs]
+        for i, doc in enumerate(docs):
+            row = tf[i]
+            for tok in doc:
+                j = col.get(tok)
+                if j is not None:
+                    row[j] += 1
+        return tf, [len(d) for d in docs]
+
+    def _lexical(self, query: str, texts: Sequence[str]) -> tuple[list[float], list[float]]:
+        """Per-candidate (BM25 / max BM25, fraction of query terms present)."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return [0.0] * len(texts), [0.0] * len(texts)
+        tf, lengths = self._term_matrix(terms, [tokenize(t) for t in texts])
+        n = len(texts)
+        avg_len = (sum(lengths) / n) or 1.0
+
+        if np is not None:
+            tf_m = np.asarray(tf, dtype=np.float64)
+            lens = np.asarray(lengths, dtype=np.float64)[:, None]
+            df = (tf_m > 0).sum(axis=0)
+            idf = np.log1p((n - df + 0.5) / (df + 0.5))
+            denom = tf_m + self.k1 * (1 - self.b + self.b * lens / avg_len)
+            bm25 = (idf * tf_m * (self.k1 + 1) / denom).sum(axis=1)
+            top = bm25.max()
+            bm25 = bm25 / top if top > 0 else bm25
+            coverage = (tf_m > 0).mean(axis=1)
+            return bm25.tolist(), coverage.tolist()
+
+        df = [sum(1 for row in tf if row[j]) for j in range(len(terms))]
+        idf = [math.log1p((n - d + 0.5) / (d + 0.5)) for d in df]
+        bm25 = []
+        for row, length in zip(tf, lengths, strict=True):
+            norm = self.k1 * (1 - self.b + self.b * length / avg_len)
+            bm25.append(
+                sum(w * f * (self.k1 + 1) / (f + norm) for w, f in zip(idf, row, strict=True))
+            )
+        top = max(bm25)
+        bm25 = [x / top for x in bm25] if top > 0 else bm25
+        coverage = [sum(1 for f in row if f) / len(terms) for row in tf]
+        return bm25, coverage
+
+    @staticmethod
+    def _cosine(embedder: Embedder, query: str, texts: Sequence[str]) -> list[float]:
+        vecs = embedder.embed_many([query, *texts])
+        if np is not None:
+            m = np.asarray(vecs, dtype=np.float32)
+            norms = np.linalg.norm(m, axis=1)
+            norms[norms == 0] = 1.0
+            m = m / norms[:, None]
+            return np.clip(m[1:] @ m[0], 0.0, 1.0).tolist()
+        q = vecs[0]
+        qn = math.sqrt(sum(x * x for x in q)) or 1.0
+        out = []
+        for v in vecs[1:]:
+            vn = math.sqrt(sum(x * x for x in v)) or 1.0
+            out.append(max(0.0, sum(a * b for a, b in zip(q, v, strict=True)) / (qn * vn)))
+        return out
+
+    def scores(self, query: str, texts: Sequence[str]) -> list[float]:
+        if not texts:
+            return []
+        bm25, coverage = self._lexical(query, texts)
+        parts = [(self.bm25_weight, bm25), (self.coverage_weight, coverage)]
+        if self.embedder is not None and self.cosine_weight > 0:
+            parts.append((self.cosine_weight, self._cosine(self.embedder, query, texts)))
+        total = sum(w for w, _ in parts) or 1.0
+        return [sum(w * feat[i] for w, feat in parts) / total for i in range(len(texts))]
+
+    def rerank(
+            self, query: str, chunks: Sequence[RetrievedChunk], limit: int | None = None
+            ) -> list[RetrievedChunk]:
+        """Best-first copies of ``chunks`` carrying their rerank score."""
+        scored = self.scores(query, [ch.text for ch in chunks])
+        order = sorted(range(len(chunks)), key=lambda i: -scored[i])[:limit]
+        return [replace(chunks[i], score=scored[i]) for i in order]
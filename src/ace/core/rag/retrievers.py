@@ -1,12 +1,26 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from typing import Protocol
 
 from ace.core.rag.models import Citation, RetrievedChunk
+from ace.core.rag.rerank import BatchReranker
 from ace.core.tool_schemas import ToolRequest
 
 
+class Retriever(Protocol):
+    """Anything RAGPipeline can fan out to; ``name`` identifies it in results."""
+
+    name: str
+
+    def retrieve(self, query: str, limit: int = 5) -> list[RetrievedChunk]: ...
+
+
 class WebRetriever:
+    """Results of the ``web_search`` tool; a failed call raises, so it is not cached."""
+
+    name = "web"
+
     def __init__(self, tool_executor) -> None:
         self.tools = tool_executor
 
@@ -18,7 +32,8 @@ class WebRetriever:
         )
         resp = self.tools.execute(req)
         if not resp.ok:
-            return []
+            err = resp.error
+            raise RuntimeError(f"web_search failed: {err.message if err else 'unknown error'}")
 
         ts = datetime.now(timezone.utc).isoformat()
         results = resp.output.get("results", [])
@@ -46,27 +61,70 @@ class WebRetriever:
 
 
 class InternalRetriever:
-    def __init__(self, memory_system) -> None:
+    """Passage-level retrieval from long-term memory.
+
+    Keyword hits are BM25-ranked passages; when there are fewer than
+    ``limit``, embedding neighbours of the query top them up with their
+    best-matching passage, as long as their cosine similarity reaches
+    ``min_similarity``. Citations carry the passage's character span.
+
+    With a ``reranker`` retrieval is two-stage: ``candidates`` passages are
+    gathered the same way, scored together by the reranker, and the best
+    ``limit`` are returned with the rerank score as ``RetrievedChunk.score``.
+    """
+
+    name = "internal"
+
+    def __init__(
+            self,
+            memory_system,
+            semantic: bool = True,
+            reranker: BatchReranker | None = None,
+            candidates: int = 50,
+            min_similarity: float = 0.2,
+            ) -> None:
         self.memory = memory_system
+        self.semantic = semantic
+        self.min_similarity = min_similarity
+        self.reranker = reranker
+        self.candidates = candidates
 
     def retrieve(self, query: str, limit: int = 5) -> list[RetrievedChunk]:
+        wide = max(limit, self.candidates) if self.reranker is not None else limit
+        chunks = self._gather(query, wide)
+        if self.reranker is not None:
+            return self.reranker.rerank(query, chunks, limit=limit)
+        return chunks
+
+    def _gather(self, query: str, limit: int) -> list[RetrievedChunk]:
         ts = datetime.now(timezone.utc).isoformat()
-        recs = self.memory.recall_long_term(query=query, limit=limit)
+        hits = self.memory.recall_passages(query=query, limit=limit)
+        scored = len(hits)
+        if self.semantic and len(hits) < limit:
+            # Top up keyword hits with embedding neighbours the keywords missed.
+            seen = {h.record_id for h in hits}
+            for h in self.memory.recall_semantic_passages(query=query, limit=limit):
+                if h.record_id not in seen and h.score >= self.min_similarity:
+                    hits.append(h)
+            hits = hits[:limit]
         chunks: list[RetrievedChunk] = []
 
-        for r in recs:
-            rid = str(r.get("id", ""))
-            text = str(r.get("text", "")).strip()
+        for h in hits:
+            text = h.text.strip()
             if not text:
                 continue
 
             cit = Citation(
                 source="internal",
-                source_id=rid,
+                source_id=h.record_id,
                 timestamp=ts,
                 snippet=text[:240],
                 confidence=0.70,
+                start=h.start,
+                end=h.end,
             )
-            chunks.append(RetrievedChunk(text=text, citation=cit))
+            # BM25 and cosine scores are not comparable; keep only a uniform list's.
+            score = h.score if scored == len(hits) else None
+            chunks.append(RetrievedChunk(text=text, citation=cit, score=score))
 
         return chunks
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import heapq
+
+from ace.core.models import Task
+
+
+class TaskGraphError(ValueError):
+    """Raised for duplicate ids, unknown dependencies or dependency cycles."""
+
+
+class DAGScheduler:
+    """Dependency-indexed task scheduler.
+
+    Keeps an in-degree per task and a reverse-dependency list, so completing a
+    task only touches its dependents and each ready task enters the heap once
+    (ordered by priority, then submission order). ``pop_ready`` is O(log n)
+    instead of the full heap rescan in ``TaskQueue.pop_ready``.
+
+    The graph is validated up front: every dependency must be another task or
+    already in ``completed``, and cycles are rejected.
+    """
+
+    def __init__(self, tasks: list[Task], completed: set[str] | None = None) -> None:
+        completed = set(completed or ())
+        self._tasks: dict[str, Task] = {}
+        for t in tasks:
+            if t.id in self._tasks:
+                raise TaskGraphError(f"Duplicate task id: {t.id}")
+            self._tasks[t.id] = t
+
+        self._order = {tid: i for i, tid in enumerate(self._tasks)}
+        self._indegree: dict[str, int] = {}
+        self._dependents: dict[str, list[str]] = {tid: [] for tid in self._tasks}
+        missing: list[str] = []
+        for t in self._tasks.values():
+            open_deps = [d for d in dict.fromkeys(t.depends_on) if d not in completed]
+            for dep in open_deps:
+                if dep not in self._tasks:
+                    missing.append(f"{t.id} -> {dep}")
+                else:
+                    self._dependents[dep].append(t.id)
+            self._indegree[t.id] = len(open_deps)
+        if missing:
+            raise TaskGraphError(f"Unknown dependencies: {', '.join(missing)}")
+        self._check_acyclic()
+
+        self._ready: list[tuple[int, int, str]] = []
+        for tid, deg in self._indegree.items():
+            if deg == 0:
+                self._push(tid)
+        self._pending = len(self._tasks)
+
+    def _check_acyclic(self) -> None:
+        indegree = dict(self._indegree)
+        stack = [tid for tid, deg in indegree.items() if deg == 0]
+        seen = 0
+        while stack:
+            tid = stack.pop()
+            seen += 1
+            for dep in self._dependents[tid]:
+                indegree[dep] -= 1
+                if indegree[dep] == 0:
+                    stack.append(dep)
+        if seen != len(indegree):
+            cyclic = sorted(tid for tid, deg in indegree.items() if deg > 0)
+            raise TaskGraphError(f"Dependency cycle among tasks: {', '.join(cyclic)}")
+
+    def _push(self, task_id: str) -> None:
+        heapq.heappush(
+            self._ready, (self._tasks[task_id].priority, self._order[task_id], task_id)
+        )
+
+    def serial_order(self) -> list[str]:
+        """Order a one-at-a-time run would execute the remaining tasks in.
+
+        Used to write results of concurrently executed tasks deterministically.
+        """
+        indegree = dict(self._indegree)
+        ready = list(self._ready)
+        order: list[str] = []
+        while ready:
+            _, _, tid = heapq.heappop(ready)
+            order.append(tid)
+            for dep in self._dependents[tid]:
+                indegree[dep] -= 1
+                if indegree[dep] == 0:
+                    heapq.heappush(ready, (self._tasks[dep].priority, self._order[dep], dep))
+        return order
+
+    def pop_ready(self) -> Task | None:
+        """Highest-priority task whose dependencies are all done, or None."""
+        if not self._ready:
+            return None
+        _, _, tid = heapq.heappop(self._ready)
+        return self._tasks[tid]
+
+    def mark_done(self, task_id: str) -> None:
+        """Record completion (success or skip) and release dependents."""
+        self._pending -= 1
+        for dep in self._dependents.get(task_id, ()):
+            self._indegree[dep] -= 1
+            if self._indegree[dep] == 0:
+                self._push(dep)
+
+    @property
+    def ready_count(self) -> int:
+        return len(self._ready)
+
+    def __len__(self) -> int:
+        """Tasks not yet marked done (ready, blocked or in flight)."""
+        return self._pending
@@ -1,17 +1,25 @@
 from __future__ import annotations
 
 import json
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
+from typing import Any
 
 from ace.core.agent import Agent
+from ace.core.checkpoint import CheckpointWriter
+from ace.core.embedding import Embedder
+from ace.core.goal_journal import GoalCheckpoint, GoalJournal, goal_id_for
 from ace.core.models import AgentState, AgentStatus, Episode, Task
 from ace.core.quality.monitor import MonitorConfig, QualityMonitor
 from ace.core.quality.reflector import RuleBasedReflector
-from ace.core.queue import TaskQueue
-from ace.core.rag.fusion import RAGFusion
+from ace.core.rag.cache import AnswerCache, RetrievalCache
+from ace.core.rag.fusion import RAGFusion, ReciprocalRankFusion
 from ace.core.rag.pipeline import RAGPipeline
+from ace.core.rag.rerank import BatchReranker
 from ace.core.rag.retrievers import InternalRetriever, WebRetriever
+from ace.core.scheduler import DAGScheduler, TaskGraphError
 from ace.core.stop import StopConfig, StopTracker
 from ace.core.tool_schemas import ToolRequest
 
@@ -20,20 +28,84 @@ AUDIT_DIR.mkdir(exist_ok=True)
 
 
 class AgentStateMachine:
-    def __init__(self, agent: Agent):
+    def __init__(
+            self,
+            agent: Agent,
+            audit_dir: Path | str = AUDIT_DIR,
+            checkpoint_interval_s: float = 0.5,
+            retrieval_deadline_s: float | None = 10.0,
+            answer_embedder: Embedder | None = None,
+            ):
         self.agent = agent
+        self.audit_dir = Path(audit_dir)
+        self.audit_dir.mkdir(parents=True, exist_ok=True)
+        self.checkpoint = CheckpointWriter(
+            self.audit_dir / "state.json",
+            min_interval_s=checkpoint_interval_s,
+        )
         self.state = AgentState(
             status=AgentStatus.IDLE,
             current_task=None,
             completed_tasks=0,
         )
+        self.results: dict[str, str] = {}
+        self.goal_id: str | None = None
         self.reflector_engine = RuleBasedReflector()
         self.monitor = QualityMonitor(MonitorConfig())
+        self.retrieval_cache = RetrievalCache()
+        # Exact matching only unless an embedder that tells entities apart is given;
+        # the hashing embedder rates "vector databases" and "graph databases" alike.
+        self.answer_cache = AnswerCache(embedder=answer_embedder)
+        self.pipeline = RAGPipeline(
+            web_retriever=WebRetriever(self.agent.tools),
+            internal_retriever=InternalRetriever(
+                self.agent.memory.system,
+                reranker=BatchReranker(embedder=self.agent.memory.system.ltm.embedder),
+            ),
+            fusion=RAGFusion(max_chunks=8, strategy=ReciprocalRankFusion(), budget=4000),
+            # A slow backend is dropped from the answer rather than stalling the task.
+            deadline_s=retrieval_deadline_s,
+            cache=self.retrieval_cache,
+            answer_cache=self.answer_cache,
+        )
+        self.agent.memory.system.add_write_listener(self._invalidate_internal_cache)
+        self._state_lock = threading.Lock()
+        # Per-thread episode buffer, set while a task runs in concurrent mode.
+        self._local = threading.local()
+
+    def close(self) -> None:
+        """Detach from memory and release the retrieval pool; memory is closed by its owner."""
+        self.agent.memory.system.remove_write_listener(self._invalidate_internal_cache)
+        self.pipeline.close()
+
+    def _begin_task(self, task: Task) -> None:
+        with self._state_lock:
+            self.state.status = AgentStatus.RUNNING
+            self.state.current_task = task.id
+            self.state.running_tasks.append(task.id)
+            self._save_state()
+
+    def _finish_task(self, task: Task, status: AgentStatus | None = None) -> None:
+        with self._state_lock:
+            if status is AgentStatus.COMPLETED:
+                self.state.completed_tasks += 1
+            if status is not None:
+                self.state.status = status
+            self.state.running_tasks.remove(task.id)
+            running = self.state.running_tasks
+            self.state.current_task = running[-1] if running else None
+            if running and status is not None:
+                self.state.status = AgentStatus.RUNNING
+            # A finished task must be on disk even if no halt flush follows.
+            self._save_state(force=True)
 
     def run_once(self, task: Task) -> bool:
-        self.state.status = AgentStatus.RUNNING
-        self.state.current_task = task.id
-        self._save_state()
+        self._begin_task(task)
+        status: AgentStatus | None = None
+        # What a task stores (chunks, reflections, its episode) is derived from
+        # what it retrieved, so it must not evict the entries for its own queries;
+        # everything else it writes invalidates as usual.
+        self._local.own_queries = set()
 
         self.agent.memory.system.add_to_stm("task", task.description, {"task_id": task.id})
 
@@ -78,47 +150,70 @@ class AgentStateMachine:
                     result_text = str(resp.output)
 
                 else:
-                    pipeline = RAGPipeline(
-                        web_retriever=WebRetriever(self.agent.tools),
-                        internal_retriever=InternalRetriever(self.agent.memory.system),
-                        fusion=RAGFusion(max_chunks=8),
-                    )
-                    rag = pipeline.run(query=query, limit=5)
+                    # A redo means the last answer fell short; don't serve it again.
+                    rag = self.pipeline.run(query=query, limit=5, bypass_cache=redos > 0)
+                    self._local.own_queries.add(query)
+                    # Reflection, the episode and the summary need the whole text;
+                    # the artifacts below are streamed from rag.lines() instead.
                     result_text = rag.answer
+                    if rag.dropped:
+                        self.agent.memory.system.add_to_stm(
+                            "retrieval",
+                            f"Dropped sources: {', '.join(sorted(rag.dropped))}",
+                            {"task_id": task.id, "dropped": rag.dropped},
+                        )
 
-                    for idx, ch in enumerate(rag.fused, start=1):
-                        self.agent.memory.system.remember_long_term(
-                            record_id=f"retrieval:{task.id}:{idx}:{ch.citation.timestamp}",
-                            text=ch.text,
-                            tags=["retrieval", "chunk", ch.citation.source],
-                            metadata={
+                    self.agent.memory.system.remember_long_term_many(
+                        {
+                            "record_id": f"retrieval:{task.id}:{idx}:{ch.citation.timestamp}",
+                            "text": ch.text,
+                            "tags": ["retrieval", "chunk", ch.citation.source],
+                            "metadata": {
                                 "task_id": task.id,
                                 "source": ch.citation.source,
                                 "source_id": ch.citation.source_id,
                                 "confidence": ch.citation.confidence,
                                 "timestamp": ch.citation.timestamp,
+                                "start": ch.citation.start,
+                                "end": ch.citation.end,
                             },
-                        )
-
-                    chunks_jsonl = "\n".join([c.to_json() for c in rag.fused])
+                        }
+                        for idx, ch in enumerate(rag.fused, start=1)
+                    )
 
+                    # Stream both artifacts line by line instead of joining them first.
                     self.agent.tools.execute(
                         ToolRequest(
                             name="file_writer",
                             input={
                                 "path": f"task_{task.id}/chunks.jsonl",
-                                "content": chunks_jsonl,
+                                "lines": rag.chunk_lines(),
                             },
                             trace_id=f"{task.id}-chunks",
                         )
                     )
 
+                    if rag.selection is not None:
+                        self.agent.tools.execute(
+                            ToolRequest(
+                                name="file_writer",
+                                input={
+                                    "path": f"task_{task.id}/selection.json",
+                                    "content": json.dumps(
+                                        {**rag.selection.to_dict(), "cached": rag.cached},
+                                        indent=2,
+                                    ),
+                                },
+                                trace_id=f"{task.id}-selection",
+                            )
+                        )
+
                     self.agent.tools.execute(
                         ToolRequest(
                             name="file_writer",
                             input={
                                 "path": f"task_{task.id}/answer.md",
-                                "content": result_text,
+                                "lines": rag.lines(),
                             },
                             trace_id=f"{task.id}-answer",
                         )
@@ -181,6 +276,7 @@ class AgentStateMachine:
             self._log_episode(episode)
 
             self.agent.memory.system.add_to_stm("result", result_text, {"task_id": task.id})
+            self.results[task.id] = result_text
 
             self.agent.memory.system.remember_long_term(
                 record_id=f"episode:{task.id}:{episode.timestamp}",
@@ -189,8 +285,7 @@ class AgentStateMachine:
                 metadata={"task_id": task.id, "success": True},
             )
 
-            self.state.completed_tasks += 1
-            self.state.status = AgentStatus.COMPLETED
+            status = AgentStatus.COMPLETED
             return True
 
         except Exception as exc:
@@ -204,6 +299,7 @@ class AgentStateMachine:
             self._log_episode(episode)
 
             self.agent.memory.system.add_to_stm("error", str(exc), {"task_id": task.id})
+            self.results[task.id] = str(exc)
 
             self.agent.memory.system.remember_long_term(
                 record_id=f"error:{task.id}:{episode.timestamp}",
@@ -212,65 +308,223 @@ class AgentStateMachine:
                 metadata={"task_id": task.id, "success": False},
             )
 
-            self.state.status = AgentStatus.FAILED
+            status = AgentStatus.FAILED
             return False
 
         finally:
-            self.state.current_task = None
-            self._save_state()
+            self._local.own_queries = set()
+            self._finish_task(task, status)
 
     def run_goal(
         self,
         goal: str,
         tasks: list[Task],
         stop_cfg: StopConfig | None = None,
+        goal_id: str | None = None,
+        workers: int = 1,
     ) -> str:
+        """Run ``tasks`` to completion; ``workers > 1`` runs independent tasks concurrently."""
         stop_cfg = stop_cfg or StopConfig()
-        tracker = StopTracker(stop_cfg)
-
-        completed: set[str] = set()
-        queue = TaskQueue()
-        queue.push_many(tasks)
+        self.goal_id = goal_id or goal_id_for(goal)
+        journal = GoalJournal(self.audit_dir / "goals", self.goal_id)
+        journal.start(goal, tasks, stop_cfg)
 
         print(f"Goal received: {goal}")
         print(f"Tasks created: {len(tasks)}")
 
         self.agent.memory.system.add_to_stm("goal", goal)
+        return self._drive(tasks, set(), StopTracker(stop_cfg), journal, workers)
+
+    def resume_goal(self, goal_id: str, workers: int = 1) -> str:
+        """Continue a goal from its journal, skipping tasks that already finished."""
+        journal = GoalJournal(self.audit_dir / "goals", goal_id)
+        cp: GoalCheckpoint = journal.load()
+        self.goal_id = goal_id
+        self.results.update(cp.results)
+        if cp.halted == "Halted: All tasks completed":
+            print(cp.halted)
+            return cp.halted
+
+        print(f"Goal resumed: {cp.goal}")
+        print(f"Tasks remaining: {len(cp.pending)} of {len(cp.tasks)}")
+
+        self.agent.memory.system.add_to_stm("resume", cp.goal, {"goal_id": goal_id})
+        # Failed tasks count as done for dependencies, as in the original run.
+        return self._drive(cp.pending, cp.completed | cp.failed, cp.tracker(), journal, workers)
+
+    def _drive(
+        self,
+        tasks: list[Task],
+        completed: set[str],
+        tracker: StopTracker,
+        journal: GoalJournal,
+        workers: int = 1,
+    ) -> str:
+        try:
+            try:
+                scheduler = DAGScheduler(tasks, completed)
+            except TaskGraphError as exc:
+                return self._halt(f"Halted: Invalid task graph: {exc}", tracker, journal)
+            if workers > 1:
+                return self._drive_concurrent(scheduler, completed, tracker, journal, workers)
+
+            while True:
+                should, reason = tracker.should_stop(len(scheduler))
+                if should:
+                    return self._halt(reason, tracker, journal)
 
-        while True:
-            should, reason = tracker.should_stop(len(queue))
-            if should:
-                print(reason)
-                self.agent.memory.system.add_to_stm("halt", reason)
-                return reason
+                tracker.tick_iteration()
 
-            tracker.tick_iteration()
+                # The graph was validated up front, so while tasks remain one is ready.
+                task = scheduler.pop_ready()
+                if task is None:
+                    tracker.mark_no_progress()
+                    continue
 
-            task = queue.pop_ready(completed)
-            if task is None:
-                tracker.mark_no_progress()
-                continue
+                ok = self.run_once(task)
+                scheduler.mark_done(task.id)
+                self._record_outcome(task, ok, completed, tracker)
+                self._journal_task(journal, task.id, ok, tracker)
+        finally:
+            journal.close()
 
+    def _drive_concurrent(
+        self,
+        scheduler: DAGScheduler,
+        completed: set[str],
+        tracker: StopTracker,
+        journal: GoalJournal,
+        workers: int,
+    ) -> str:
+        """Dispatch every ready task to a thread pool, up to ``workers`` at a time.
+
+        Episodes are buffered per task and written in the order a serial run
+        would have produced them, so the audit log does not depend on timing.
+        A task is journaled only once its episodes are written, so a resume
+        after a crash never skips a task whose episodes were still buffered.
+
+        ``state.current_task`` is the most recently started of
+        ``state.running_tasks``, and the quality monitor's repeated-query and
+        low-score streak checks see the interleaved queries and scores of all
+        running tasks; both are approximate in this mode.
+        """
+        self.pipeline.ensure_workers(workers)
+        order = scheduler.serial_order()
+        buffered: dict[str, list[Episode]] = {}
+        outcomes: dict[str, bool] = {}
+        next_pos = 0
+
+        def write_ready_episodes(final: bool = False) -> None:
+            nonlocal next_pos
+            while next_pos < len(order) and (final or order[next_pos] in buffered):
+                task_id = order[next_pos]
+                for episode in buffered.pop(task_id, []):
+                    self._write_episode(episode)
+                if task_id in outcomes:
+                    self._journal_task(journal, task_id, outcomes.pop(task_id), tracker)
+                next_pos += 1
+
+        running: dict[Future[tuple[bool, list[Episode]]], Task] = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ace-task") as pool:
+            while True:
+                should, reason = tracker.should_stop(len(scheduler))
+                while not should and len(running) < workers:
+                    task = scheduler.pop_ready()
+                    if task is None:
+                        break
+                    tracker.tick_iteration()
+                    running[pool.submit(self._run_buffered, task)] = task
+                    should, reason = tracker.should_stop(len(scheduler))
+
+                if not running:
+                    if should:
+                        write_ready_episodes(final=True)
+                        return self._halt(reason, tracker, journal)
+                    tracker.mark_no_progress()
+                    continue
+
+                # Block until some task finishes instead of polling for readiness.
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in sorted(done, key=lambda f: order.index(running[f].id)):
+                    task = running.pop(fut)
+                    ok, episodes = fut.result()
+                    scheduler.mark_done(task.id)
+                    buffered[task.id] = episodes
+                    outcomes[task.id] = ok
+                    self._record_outcome(task, ok, completed, tracker)
+                write_ready_episodes()
+
+    def _run_buffered(self, task: Task) -> tuple[bool, list[Episode]]:
+        self._local.episodes = []
+        try:
             ok = self.run_once(task)
-            if ok:
-                completed.add(task.id)
-                tracker.mark_progress()
-                print(f"Tasks executed: {task.id}")
-            else:
-                # ✅ Milestone 7 loop breaker: don't stall the whole run on one failure.
-                completed.add(task.id)
-                tracker.mark_progress()
-                print(f"Task failed (skipped): {task.id}")
-                self.agent.memory.system.add_to_stm(
-                    "skip",
-                    f"Skipped failed task: {task.id}",
-                    {"task_id": task.id},
-                )
+            return ok, self._local.episodes
+        finally:
+            self._local.episodes = None
+
+    def _record_outcome(
+        self,
+        task: Task,
+        ok: bool,
+        completed: set[str],
+        tracker: StopTracker,
+    ) -> None:
+        completed.add(task.id)
+        tracker.mark_progress()
+        if ok:
+            print(f"Tasks executed: {task.id}")
+        else:
+            # ✅ Milestone 7 loop breaker: don't stall the whole run on one failure.
+            print(f"Task failed (skipped): {task.id}")
+            self.agent.memory.system.add_to_stm(
+                "skip",
+                f"Skipped failed task: {task.id}",
+                {"task_id": task.id},
+            )
 
-    def _save_state(self) -> None:
-        with open(AUDIT_DIR / "state.json", "w", encoding="utf-8") as f:
-            json.dump(self.state.to_dict(), f, indent=2)
+    def _journal_task(
+        self, journal: GoalJournal, task_id: str, ok: bool, tracker: StopTracker
+    ) -> None:
+        # Called after the task's episodes are logged; make them and its queued
+        # LTM writes durable first, or a resume after a crash would skip a task
+        # whose memory was lost.
+        self.agent.memory.system.flush()
+        self.agent.memory.system.episodic.flush()
+        journal.task_done(task_id, ok, self.results.get(task_id, ""), tracker)
+
+    def _halt(self, reason: str, tracker: StopTracker, journal: GoalJournal) -> str:
+        print(reason)
+        self.agent.memory.system.add_to_stm("halt", reason)
+        self.agent.memory.system.flush()
+        self.agent.memory.system.episodic.flush()
+        self.checkpoint.flush()
+        journal.halt(reason, tracker)
+        return reason
+
+    def _invalidate_internal_cache(self, records: list[dict[str, Any]]) -> None:
+        texts = [str(r.get("text", "")) for r in records]
+        keep = getattr(self._local, "own_queries", ())
+        self.retrieval_cache.invalidate_matching(texts, sources=["internal"], keep=keep)
+        # Whole answers embed internal results too.
+        self.answer_cache.invalidate_matching(texts, keep=keep)
+
+    def _save_state(self, force: bool = False) -> None:
+        self.checkpoint.write(self.state.to_dict(), force=force)
 
     def _log_episode(self, episode: Episode) -> None:
-        with open(AUDIT_DIR / "episodes.jsonl", "a", encoding="utf-8") as f:
-            f.write(episode.to_json() + "\n")
+        buffer = getattr(self._local, "episodes", None)
+        if buffer is not None:
+            buffer.append(episode)
+            return
+        self._write_episode(episode)
+
+    def _write_episode(self, episode: Episode) -> None:
+        # Routed through EpisodicMemory so segment rotation sees every write.
+        self.agent.memory.system.episodic.append_line(
+            episode.to_json(),
+            fields={
+                "task_id": episode.task_id,
+                "success": episode.success,
+                "timestamp": episode.timestamp,
+            },
+        )
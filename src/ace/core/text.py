@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import hashlib
+import re
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> str:
+    """Case- and whitespace-insensitive form used for content addressing."""
+    return " ".join(text.lower().split())
+
+
+def fingerprint(text: str) -> str:
+    """SHA-256 of the normalized text; equal for trivially different copies."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased word tokens, punctuation dropped."""
+    return _WORD.findall(text.lower())
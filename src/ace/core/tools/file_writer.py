@@ -16,6 +16,29 @@ class FileWriterTool:
         start=time.time()
         rel_path=str(request.input.get("path","")).strip()
         content=request.input.get("content","")
+        # Streaming input: an iterable of lines, each written with a trailing newline.
+        lines=request.input.get("lines")
+        mode=str(request.input.get("mode","write"))
+        if mode not in {"write","append"}:
+            return ToolResponse(
+                ok=False,
+                name=self.name,
+                error=ToolError(code="INVALID_INPUT", message=f"Unknown mode: {mode!r}"),
+                attempts=1,
+                duration_ms=int((time.time()-start)*1000),
+            )
+        if isinstance(lines,(str,bytes)):
+            # A bare string would otherwise be written one character per line.
+            return ToolResponse(
+                ok=False,
+                name=self.name,
+                error=ToolError(
+                    code="INVALID_INPUT",
+                    message="'lines' must be an iterable of strings, not a string",
+                ),
+                attempts=1,
+                duration_ms=int((time.time()-start)*1000),
+            )
         if not rel_path:
             return ToolResponse(
                 ok=False,
@@ -36,12 +59,17 @@ class FileWriterTool:
             )
         
         target.parent.mkdir(parents=True,exist_ok=True)
-        target.write_text(str(content),encoding="utf-8")
+        written=0
+        with open(target,"a" if mode=="append" else "w",encoding="utf-8") as f:
+            pieces=(f"{line}\n" for line in lines) if lines is not None else [str(content)]
+            for piece in pieces:
+                f.write(piece)
+                written+=len(piece.encode("utf-8"))
 
         return ToolResponse(
             ok=True,
             name=self.name,
-            output={"written_to":str(target),"bytes":len(str(content).encode("utf-8"))},
+            output={"written_to":str(target),"bytes":written,"mode":mode},
             attempts=1,
             duration_ms=int((time.time()-start)*1000),
         )
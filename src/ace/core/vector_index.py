@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import heapq
+import math
+from array import array
+from collections.abc import Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+
+def pack_vector(vec: Sequence[float]) -> bytes:
+    """Serialize an embedding as a packed float32 blob."""
+    return array("f", vec).tobytes()
+
+
+def unpack_vector(blob: bytes) -> list[float]:
+    vec = array("f")
+    vec.frombytes(blob)
+    return vec.tolist()
+
+
+class VectorIndex:
+    """In-memory cosine index over record embeddings.
+
+    Rows are L2-normalized on insert so a query is a single matrix-vector
+    product followed by ``argpartition`` for the top-k. Without NumPy the same
+    API falls back to a pure-Python scan with ``heapq.nlargest``.
+    """
+
+    def __init__(self, initial_capacity: int = 256) -> None:
+        self.dim: int | None = None
+        self._ids: list[str] = []
+        self._pos: dict[str, int] = {}
+        self._capacity = max(1, initial_capacity)
+        self._mat = None  # numpy matrix (capacity x dim) or list of row lists
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, record_id: str) -> bool:
+        return record_id in self._pos
+
+    def _normalize(self, vec: Sequence[float]) -> list[float] | np.ndarray:
+        if self.dim is None:
+            self.dim = len(vec)
+        elif len(vec) != self.dim:
+            raise ValueError(f"Embedding has dim {len(vec)}, index expects {self.dim}")
+
+        if np is not None:
+            v = np.asarray(vec, dtype=np.float32)
+            norm = float(np.linalg.norm(v))
+            return v / norm if norm > 0 else v
+        norm = math.sqrt(sum(x * x for x in vec))
+        return [x / norm for x in vec] if norm > 0 else list(vec)
+
+    def upsert(self, record_id: str, vec: Sequence[float]) -> None:
+        row = self._normalize(vec)
+        pos = self._pos.get(record_id)
+
+        if np is None:
+            if self._mat is None:
+                self._mat = []
+            if pos is None:
+                self._pos[record_id] = len(self._ids)
+                self._ids.append(record_id)
+                self._mat.append(row)
+            else:
+                self._mat[pos] = row
+            return
+
+        if self._mat is None:
+            self._mat = np.zeros((self._capacity, self.dim), dtype=np.float32)
+        if pos is None:
+            pos = len(self._ids)
+            if pos >= self._mat.shape[0]:
+                grown = np.zeros((self._mat.shape[0] * 2, self.dim), dtype=np.float32)
+                grown[:pos] = self._mat[:pos]
+                self._mat = grown
+            self._pos[record_id] = pos
+            self._ids.append(record_id)
+        self._mat[pos] = row
+
+    def remove(self, record_id: str) -> None:
+        pos = self._pos.pop(record_id, None)
+        if pos is None:
+            return
+        # Swap the last row into the hole so the matrix stays dense.
+        last = len(self._ids) - 1
+        last_id = self._ids.pop()
+        if pos != last:
+            self._ids[pos] = last_id
+            self._pos[last_id] = pos
+            self._mat[pos] = self._mat[last]
+        if np is None:
+            self._mat.pop()
+
+    def search(self, query: Sequence[float], k: int = 5) -> list[tuple[str, float]]:
+        """Return up to ``k`` ``(record_id, cosine)`` pairs, best first."""
+        n = len(self._ids)
+        if n == 0 or k <= 0:
+            return []
+        q = self._normalize(query)
+        k = min(k, n)
+
+        if np is None:
+            scored = (
+                (sum(a * b for a, b in zip(row, q, strict=True)), i)
+                for i, row in enumerate(self._mat)
+            )
+            return [(self._ids[i], s) for s, i in heapq.nlargest(k, scored)]
+
+        scores = self._mat[:n] @ q
+        top = np.argpartition(-scores, k - 1)[:k] if k < n else np.arange(n)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self._ids[i], float(scores[i])) for i in top]
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import threading
+from typing import Any
+
+from ace.core.memory_store import SQLiteMemoryStore
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WriteBehindWriter:
+    """Queue long-term writes and commit them from a background thread.
+
+    Items are ``add_text`` keyword dicts. The worker coalesces whatever is
+    queued (up to ``batch_size``) into a single ``add_texts`` transaction. The
+    queue is bounded: ``submit`` blocks when it is full, or raises
+    ``queue.Full`` once ``put_timeout_s`` expires. ``flush`` waits until
+    everything submitted so far is committed and re-raises the first write
+    error seen since the previous flush.
+    """
+
+    def __init__(
+            self,
+            store: SQLiteMemoryStore,
+            max_queue: int = 1024,
+            batch_size: int = 256,
+            put_timeout_s: float | None = None,
+            ) -> None:
+        self.store = store
+        self.batch_size = batch_size
+        self.put_timeout_s = put_timeout_s
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=max_queue)
+        self._error: BaseException | None = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="ace-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    def submit(self, items: list[dict[str, Any]]) -> None:
+        if self._closed:
+            raise RuntimeError("WriteBehindWriter is closed")
+        for item in items:
+            self._queue.put(item, timeout=self.put_timeout_s)
+
+    def flush(self) -> None:
+        self._queue.join()
+        err, self._error = self._error, None
+        if err is not None:
+            raise RuntimeError("Write-behind batch failed") from err
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        atexit.unregister(self.close)
+        if self._error is not None:
+            logger.error("Write-behind closed with an unreported error: %s", self._error)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch: list[dict[str, Any]] = []
+            stop = item is _STOP
+            if not stop:
+                batch.append(item)
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                else:
+                    batch.append(item)
+
+            try:
+                if batch:
+                    self.store.add_texts(batch)
+            except Exception as exc:  # keep draining; flush() reports it
+                logger.exception("Write-behind batch of %d records failed", len(batch))
+                if self._error is None:
+                    self._error = exc
+            finally:
+                for _ in range(len(batch) + int(stop)):
+                    self._queue.task_done()
+            if stop:
+                return
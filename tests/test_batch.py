@@ -0,0 +1,48 @@
+import json
+
+from ace.core.batch import load_goals, run_batch
+
+
+def test_load_goals_skips_blanks_and_comments(tmp_path):
+    txt = tmp_path / "goals.txt"
+    txt.write_text("# daily\nSurvey vector stores\n\nCompare chunkers\n")
+    assert load_goals(txt) == ["Survey vector stores", "Compare chunkers"]
+
+    jsonl = tmp_path / "goals.jsonl"
+    jsonl.write_text('{"goal": "Survey vector stores"}\n')
+    assert load_goals(jsonl) == ["Survey vector stores"]
+
+
+def test_run_batch_isolates_workers_and_aggregates_report(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    goals = ["Survey vector stores", "Compare chunkers", "Review caching"]
+    report = run_batch(goals, work_dir=tmp_path / "batch", workers=2, run_id="r1")
+
+    assert [g.goal for g in report.goals] == goals
+    assert report.succeeded == 3
+    assert all(g.completed + g.failed == 4 and g.duration_s > 0 for g in report.goals)
+
+    workers = {g.worker for g in report.goals}
+    assert workers <= {"worker-0", "worker-1"}
+    for name in workers:
+        root = tmp_path / "batch" / "r1" / name
+        assert (root / "data" / "memory.db").exists()
+        assert (root / "audit" / "episodes.jsonl").exists()
+        # The worker finalizer closed the store: SQLite removes the WAL on last close.
+        assert not (root / "data" / "memory.db-wal").exists()
+
+    report.write(tmp_path / "report.json")
+    data = json.loads((tmp_path / "report.json").read_text())
+    assert data["run_id"] == "r1" and data["goals_total"] == 3 and data["goals_succeeded"] == 3
+    assert sum(w["goals"] for w in data["per_worker"].values()) == 3
+
+
+def test_runs_get_separate_worker_directories(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    first = run_batch(["Survey vector stores"], work_dir=tmp_path / "batch", workers=1)
+    second = run_batch(["Survey vector stores"], work_dir=tmp_path / "batch", workers=1)
+
+    assert first.run_id != second.run_id
+    assert sorted(p.name for p in (tmp_path / "batch").iterdir()) == sorted(
+        [first.run_id, second.run_id]
+    )
@@ -0,0 +1,27 @@
+from ace.core.chunking import PassageChunker
+
+TEXT = (
+    "First sentence here. Second one is a bit longer! Third? Fourth sentence.\n\n"
+    "New paragraph with words. Another one."
+)
+
+
+def test_sentence_windows_overlap_and_keep_offsets():
+    passages = PassageChunker(max_chars=50, overlap=1).split(TEXT)
+    assert len(passages) == 4
+    for p in passages:
+        assert TEXT[p.start : p.end] == p.text
+        assert len(p.text) <= 50
+    # Each window starts with the last sentence of the previous one.
+    assert passages[1].text.startswith("Second one")
+    assert passages[0].text.endswith("Second one is a bit longer!")
+
+
+def test_paragraph_windows_and_short_text():
+    passages = PassageChunker(max_chars=80, unit="paragraph").split(TEXT)
+    assert [p.text for p in passages] == [
+        "First sentence here. Second one is a bit longer! Third? Fourth sentence.",
+        "New paragraph with words. Another one.",
+    ]
+    assert [(p.start, p.end) for p in PassageChunker().split("  short note ")] == [(2, 12)]
+    assert PassageChunker().split("   ") == []
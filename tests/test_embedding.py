@@ -0,0 +1,45 @@
+from ace.core.embedding import CachedEmbedder, HashingEmbedder
+from ace.core.memory_store import SQLiteMemoryStore
+
+
+def _cos(a, b):
+    return sum(x * y for x, y in zip(a, b, strict=True))
+
+
+def test_hashing_embedder_is_deterministic_and_similarity_aware():
+    emb = HashingEmbedder(dim=128)
+    a = emb.embed("Agent memory systems")
+    assert a == HashingEmbedder(dim=128).embed("agent   MEMORY systems")
+    assert len(a) == 128
+    assert _cos(a, emb.embed("agent memory system")) > _cos(a, emb.embed("tomato soup recipe"))
+
+
+def test_cached_embedder_embeds_duplicate_text_once():
+    calls = []
+
+    class Counting(HashingEmbedder):
+        def embed_many(self, texts):
+            calls.append(list(texts))
+            return super().embed_many(texts)
+
+    cached = CachedEmbedder(Counting(dim=32))
+    cached.embed_many(["same chunk", "Same  chunk", "other"])
+    cached.embed("same chunk")
+
+    assert calls == [["same chunk", "other"]]
+    assert cached.stats()["hits"] == 1
+
+
+def test_store_embeds_on_add_and_searches_semantically(tmp_path):
+    store = SQLiteMemoryStore(
+        db_path=str(tmp_path / "memory.db"), embedder=CachedEmbedder(HashingEmbedder())
+    )
+    store.add_texts(
+        [
+            {"record_id": "a", "text": "long-term memory for research agents"},
+            {"record_id": "b", "text": "baking sourdough bread at home"},
+        ]
+    )
+
+    hits = store.search_semantic("research agent memories", k=1)
+    assert [r.id for r, _ in hits] == ["a"]
@@ -0,0 +1,30 @@
+from ace.core.tool_schemas import ToolRequest
+from ace.core.tools.file_writer import FileWriterTool
+
+
+def _write(tool, **inp):
+    return tool.run(ToolRequest(name="file_writer", input=inp))
+
+
+def test_streamed_lines_and_append_mode(tmp_path):
+    tool = FileWriterTool(base_dir=str(tmp_path))
+    consumed = []
+
+    def lines():
+        for i in range(3):
+            consumed.append(i)
+            yield f'{{"n": {i}}}'
+
+    resp = _write(tool, path="task/chunks.jsonl", lines=lines())
+    assert resp.ok and resp.output["bytes"] == 3 * len('{"n": 0}\n')
+    assert consumed == [0, 1, 2]
+
+    assert _write(tool, path="task/chunks.jsonl", lines=['{"n": 3}'], mode="append").ok
+    text = (tmp_path / "task" / "chunks.jsonl").read_text()
+    assert text.splitlines() == ['{"n": 0}', '{"n": 1}', '{"n": 2}', '{"n": 3}']
+
+    assert _write(tool, path="task/chunks.jsonl", content="reset").ok
+    assert (tmp_path / "task" / "chunks.jsonl").read_text() == "reset"
+    assert _write(tool, path="x.txt", content="", mode="truncate").error.code == "INVALID_INPUT"
+    assert _write(tool, path="x.txt", lines="one line").error.code == "INVALID_INPUT"
+    assert not (tmp_path / "x.txt").exists()
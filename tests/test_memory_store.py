@@ -0,0 +1,219 @@
+import sqlite3
+
+from ace.core.chunking import PassageChunker
+from ace.core.memory_store import SQLiteMemoryStore
+
+
+def test_search_is_tokenized_and_bm25_ranked(tmp_path):
+    store = SQLiteMemoryStore(db_path=str(tmp_path / "memory.db"))
+    store.add_text("a", "agent memory systems store episodes")
+    store.add_text("b", "memory memory memory for agents")
+    store.add_text("c", "unrelated gardening notes")
+
+    ids = [r.id for r in store.search("Memory, agent?", limit=5)]
+    assert set(ids) == {"a", "b"}
+    assert "c" not in ids
+
+
+def test_fts_index_follows_updates(tmp_path):
+    store = SQLiteMemoryStore(db_path=str(tmp_path / "memory.db"))
+    store.add_text("a", "first version about planners")
+    store.add_text("a", "second version about reflection")
+
+    assert store.search("planners") == []
+    assert [r.id for r in store.search("reflection")] == ["a"]
+
+
+def test_legacy_database_is_migrated(tmp_path):
+    db = tmp_path / "memory.db"
+    con = sqlite3.connect(db)
+    con.execute(
+        "CREATE TABLE ltm_records (id TEXT PRIMARY KEY, text TEXT NOT NULL, "
+        "created_at REAL NOT NULL, tags TEXT NOT NULL, metadata TEXT NOT NULL, embedding TEXT)"
+    )
+    con.execute(
+        "INSERT INTO ltm_records VALUES ('old', 'legacy research note', 1.0, '[]', '{}', '[0.5]')"
+    )
+    con.commit()
+    con.close()
+
+    store = SQLiteMemoryStore(db_path=str(db))
+    hits = store.search("research")
+    assert [r.id for r in hits] == ["old"]
+    assert hits[0].embedding == [0.5]
+    assert [(p.record_id, p.text) for p in store.search_passages("research")] == [
+        ("old", "legacy research note")
+    ]
+
+
+def test_like_fallback_without_fts(tmp_path):
+    store = SQLiteMemoryStore(db_path=str(tmp_path / "memory.db"))
+    store.fts_enabled = False
+    store.add_text("a", "substring match only")
+
+    assert [r.id for r in store.search("string mat")] == ["a"]
+
+
+def test_upsert_many_writes_batch_on_wal_connection(tmp_path):
+    store = SQLiteMemoryStore(db_path=str(tmp_path / "memory.db"))
+    written = store.add_texts(
+        {"record_id": f"r{i}", "text": f"chunk {i} about retrieval", "tags": ["chunk"]}
+        for i in range(3)
+    )
+
+    assert written == 3
+    assert {r.id for r in store.recent(limit=10)} == {"r0", "r1", "r2"}
+    mode = store._con.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode.lower() == "wal"
+    store.close()
+
+
+def _embedded(rid, vec):
+    rec = SQLiteMemoryStore._new_record(rid, f"text {rid}")
+    rec.embedding = vec
+    return rec
+
+
+def test_search_vector_returns_cosine_top_k(tmp_path):
+    store = SQLiteMemoryStore(db_path=str(tmp_path / "memory.db"))
+    store.upsert_many([_embedded("x", [1.0, 0.0]), _embedded("y", [0.0, 1.0])])
+    store.upsert(_embedded("z", [0.9, 0.1]))
+
+    hits = store.search_vector([1.0, 0.05], k=2)
+    assert [r.id for r, _ in hits] == ["x", "z"]
+    assert isinstance(store.search("text")[0].embedding, list)
+
+    # Incremental update after the index is loaded.
+    store.upsert(_embedded("y", [1.0, 0.0]))
+    assert {r.id for r, _ in store.search_vector([1.0, 0.0], k=2)} == {"x", "y"}
+
+
+def test_vector_index_without_numpy(monkeypatch):
+    from ace.core import vector_index
+
+    monkeypatch.setattr(vector_index, "np", None)
+    index = vector_index.VectorIndex()
+    index.upsert("a", [1.0, 0.0])
+    index.upsert("b", [0.0, 2.0])
+    index.remove("a")
+    index.upsert("c", [1.0, 1.0])
+
+    assert [rid for rid, _ in index.search([0.0, 1.0], k=2)] == ["b", "c"]
+
+
+def test_duplicate_text_is_merged_into_existing_record(tmp_path):
+    store = SQLiteMemoryStore(db_path=str(tmp_path / "memory.db"))
+    store.add_text("retrieval:t1:1:a", "Same chunk", ["retrieval"], {"task_id": "t1"})
+    store.add_text("retrieval:t2:1:b", "same   CHUNK", ["chunk"], {"task_id": "t2"})
+
+    recs = store.recent(limit=10)
+    assert [r.id for r in recs] == ["retrieval:t1:1:a"]
+    assert recs[0].tags == ["retrieval", "chunk"]
+    assert recs[0].metadata == {"task_id": "t1"}
+
+
+def test_duplicate_write_keeps_the_original_task_filterable(tmp_path):
+    from ace.core.memory_store import MemoryFilter
+
+    store = SQLiteMemoryStore(db_path=str(tmp_path / "memory.db"))
+    store.add_text("episode:t1", "Answer text", ["episode"], {"task_id": "t1", "success": True})
+    store.add_text("retrieval:t2:1", "answer text", ["retrieval"], {"task_id": "t2", "kind": "x"})
+
+    hits = store.search("answer", filters=MemoryFilter(tags=["episode"], task_id="t1"))
+    assert [r.id for r in hits] == ["episode:t1"]
+    assert hits[0].metadata == {"task_id": "t1", "success": True, "kind": "x"}
+    assert store.search("answer", filters=MemoryFilter(task_id="t2")) == []
+
+
+def test_rewriting_a_record_with_duplicate_text_drops_its_old_row(tmp_path):
+    store = SQLiteMemoryStore(db_path=str(tmp_path / "memory.db"))
+    store.add_text("X", "foo alpha")
+    store.add_text("Y", "bar beta")
+    store.add_text("X", "bar beta")
+
+    assert [r.id for r in store.recent(limit=10)] == ["Y"]
+    assert store.search("alpha") == []
+    assert [r.id for r in store.search("beta")] == ["Y"]
+
+
+def test_compact_applies_tag_ttls_and_size_cap(tmp_path):
+    from ace.core.memory_store import DAY, RetentionPolicy
+
+    policy = RetentionPolicy(max_records=2, compact_every=0)
+    store = SQLiteMemoryStore(db_path=str(tmp_path / "memory.db"), retention=policy)
+    old = SQLiteMemoryStore._new_record("old", "stale chunk", ["retrieval"])
+    old.created_at -= 8 * DAY
+    kept = SQLiteMemoryStore._new_record("ep", "old episode", ["retrieval", "episode"])
+    kept.created_at -= 8 * DAY
+    store.upsert_many([old, kept])
+    for rid in ("a", "b"):
+        store.add_text(rid, f"fresh note {rid}")
+    store.search("note a")  # touch "a" (and "b") so "ep" is least recently used
+    hits = store._con.execute("SELECT SUM(hits) FROM ltm_records").fetchone()[0]
+    assert hits == 0  # the read buffered its access stats instead of writing them
+
+    report = store.compact()
+    assert (report.expired, report.evicted) == (1, 1)
+    assert {r.id for r in store.recent(limit=10)} == {"a", "b"}
+
+
+def test_search_and_recent_push_down_tag_and_metadata_filters(tmp_path):
+    from ace.core.memory_store import MemoryFilter
+
+    store = SQLiteMemoryStore(db_path=str(tmp_path / "memory.db"))
+    store.add_text("r1", "reflection on planning", ["reflection"], {"task_id": "t3"})
+    store.add_text("r2", "reflection on retrieval", ["reflection"], {"task_id": "t1"})
+    failed_meta = {"task_id": "t3", "success": False}
+    store.add_text("e1", "episode planning failed", ["episode"], failed_meta)
+
+    only_t3 = MemoryFilter(tags=["reflection"], task_id="t3")
+    assert [r.id for r in store.search("reflection planning", filters=only_t3)] == ["r1"]
+    failed = store.recent(limit=10, filters=MemoryFilter(tags=["episode"], success=False))
+    assert [r.id for r in failed] == ["e1"]
+
+
+def test_projected_rows_decode_lazily(tmp_path):
+    store = SQLiteMemoryStore(db_path=str(tmp_path / "memory.db"))
+    store.add_text("a", "projection test", ["t"], {"k": 1})
+
+    full = store.search("projection")[0]
+    assert full.tags == ["t"] and full.metadata == {"k": 1} and full.embedding is None
+
+    slim = store.search("projection", columns=["text"])[0]
+    assert (slim.id, slim.text) == ("a", "projection test")
+    assert not hasattr(slim, "metadata")
+
+
+def test_long_records_are_searched_by_passage_with_offsets(tmp_path):
+    store = SQLiteMemoryStore(
+        db_path=str(tmp_path / "memory.db"), chunker=PassageChunker(max_chars=60, overlap=0)
+    )
+    text = (
+        "Planners split goals into tasks. Schedulers order them by dependency. "
+        "Write-ahead logging keeps SQLite readers unblocked. Reflection scores answers."
+    )
+    store.add_text("long", text)
+    store.add_text("short", "Reflection notes")
+
+    hit = store.search_passages("sqlite logging", limit=1)[0]
+    assert hit.record_id == "long"
+    assert text[hit.start : hit.end] == hit.text == (
+        "Write-ahead logging keeps SQLite readers unblocked."
+    )
+    assert len(store.passages(["long"])["long"]) == 4
+
+    store._con.execute("DELETE FROM ltm_records WHERE id = 'long'")
+    assert store.search_passages("sqlite") == []
+
+
+def test_search_passages_returns_one_passage_per_record(tmp_path):
+    store = SQLiteMemoryStore(
+        db_path=str(tmp_path / "memory.db"), chunker=PassageChunker(max_chars=40, overlap=1)
+    )
+    store.add_text("other", "One checkpoint among notes on gardening, tomatoes and soil.")
+    store.add_text("long", " ".join(f"Checkpoint note {i} on writers." for i in range(10)))
+
+    for fts in (True, False):
+        store.fts_enabled = fts
+        hits = store.search_passages("checkpoint", limit=2)
+        assert sorted(h.record_id for h in hits) == ["long", "other"]
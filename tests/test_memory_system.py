@@ -0,0 +1,90 @@
+from ace.core.memory_store import SQLiteMemoryStore
+from ace.core.memory_system import EpisodicMemory, MemorySystem, ShortTermMemory
+
+
+def _system(tmp_path):
+    return MemorySystem(
+        stm=ShortTermMemory(path=tmp_path / "stm.json"),
+        episodic=EpisodicMemory(episodes_path=str(tmp_path / "episodes.jsonl")),
+        ltm=SQLiteMemoryStore(db_path=str(tmp_path / "memory.db")),
+    )
+
+
+def test_write_behind_batches_and_reads_its_own_writes(tmp_path):
+    system = _system(tmp_path)
+    system.enable_write_behind(max_queue=4, batch_size=8)
+
+    system.remember_long_term_many(
+        {"record_id": f"c{i}", "text": f"queued chunk number {i}"} for i in range(10)
+    )
+    system.remember_long_term("r", "queued reflection", tags=["reflection"])
+
+    assert {r["id"] for r in system.recall_long_term("queued", limit=20)} == {
+        *(f"c{i}" for i in range(10)),
+        "r",
+    }
+    system.close()
+
+
+def test_stm_journal_replays_after_snapshot(tmp_path):
+    path = tmp_path / "stm.json"
+    stm = ShortTermMemory(max_items=3, path=path, snapshot_every=4)
+    for i in range(6):
+        stm.add({"n": i})
+    stm.close()
+
+    assert path.exists() and stm.journal_path.exists()  # snapshot at 4, 2 journaled after
+    reloaded = ShortTermMemory(max_items=3, path=path)
+    reloaded.load()
+    assert reloaded.snapshot() == [{"n": 3}, {"n": 4}, {"n": 5}]
+
+
+def test_episodes_rotate_into_gzip_segments_and_tail_across_them(tmp_path):
+    episodic = EpisodicMemory(episodes_path=str(tmp_path / "episodes.jsonl"), max_segment_bytes=60)
+    for i in range(10):
+        episodic.append_line(f'{{"task_id": "t{i}", "pad": "xxxxxxxxxx"}}')
+
+    assert episodic.segments and all(p.suffix == ".gz" for p in episodic.segments)
+    assert episodic.manifest_path.exists()
+    recent = episodic.load_recent(limit=4)
+    assert [e["task_id"] for e in recent] == ["t6", "t7", "t8", "t9"]
+
+
+def test_load_recent_after_rotation_reads_only_the_lines_it_returns(tmp_path, monkeypatch):
+    import gzip
+
+    episodic = EpisodicMemory(episodes_path=str(tmp_path / "episodes.jsonl"))
+    for i in range(200):
+        episodic.append_line(f'{{"task_id": "t{i}", "pad": "xxxxxxxxxx"}}')
+    episodic.rotate()  # the active file is now empty
+
+    reads = []
+    original = gzip.GzipFile.read
+
+    def read(self, size=-1):
+        reads.append(size)
+        return original(self, size)
+
+    monkeypatch.setattr(gzip.GzipFile, "read", read)
+    recent = episodic.load_recent(limit=3)
+    assert [e["task_id"] for e in recent] == ["t197", "t198", "t199"]
+    assert reads and all(0 < size < 100 for size in reads)
+
+
+def test_episode_query_seeks_by_index(tmp_path):
+    import json
+    from datetime import datetime
+
+    path = tmp_path / "episodes.jsonl"
+    legacy = {"task_id": "t0", "success": True, "timestamp": "2026-01-01T00:00:00"}
+    path.write_text(json.dumps(legacy) + "\n")
+    episodic = EpisodicMemory(episodes_path=str(path), max_segment_bytes=150)  # indexes t0
+    for i, ok in enumerate([False, True, False], start=1):
+        ts = f"2026-01-0{i + 1}T00:00:00"
+        episodic.append_line(json.dumps({"task_id": "t2", "success": ok, "timestamp": ts}))
+
+    failed = episodic.query(task_id="t2", success=False)
+    assert [e["timestamp"] for e in failed] == ["2026-01-02T00:00:00", "2026-01-04T00:00:00"]
+    assert episodic.segments  # results span a rotated gzip segment
+    assert len(episodic.query(since=datetime(2026, 1, 3))) == 2
+    assert [e["task_id"] for e in episodic.query(limit=1)] == ["t2"]
@@ -0,0 +1,181 @@
+from ace.core.embedding import HashingEmbedder
+from ace.core.rag.cache import AnswerCache, RetrievalCache
+from ace.core.rag.models import Citation, RetrievedChunk
+from ace.core.rag.pipeline import RAGPipeline
+from ace.core.rag.retrievers import WebRetriever
+from ace.core.tool_schemas import ToolError, ToolResponse
+from ace.core.tools.web_search import WebSearchTool
+
+
+def _chunk(text, source="web"):
+    return RetrievedChunk(text=text, citation=Citation(source, "id", "ts", text, 0.5))
+
+
+class CountingRetriever:
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+
+    def retrieve(self, query, limit=5):
+        self.calls += 1
+        return [_chunk(f"{self.name}: {query}", self.name)]
+
+
+def test_cache_key_ignores_case_and_whitespace():
+    cache = RetrievalCache()
+    cache.put("Agent  Memory", "web", 5, [_chunk("x")])
+    assert cache.get(" agent memory ", "web", 5) is not None
+    assert cache.get("agent memory", "web", 3) is None
+    assert cache.get("agent memory", "internal", 5) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_cache_enforces_lru_bound_and_per_source_ttl():
+    now = [0.0]
+    cache = RetrievalCache(max_items=2, ttls={"web": 100, "internal": 10}, clock=lambda: now[0])
+    cache.put("a", "web", 5, [])
+    cache.put("b", "internal", 5, [])
+    cache.get("a", "web", 5)
+    cache.put("c", "web", 5, [])  # evicts b, the least recently used
+    assert cache.get("b", "internal", 5) is None
+
+    cache.put("b", "internal", 5, [])
+    now[0] = 50
+    assert cache.get("b", "internal", 5) is None
+    assert cache.get("c", "web", 5) is not None
+
+
+def test_invalidate_matching_only_touches_given_sources():
+    cache = RetrievalCache()
+    cache.put("vector index", "internal", 5, [])
+    cache.put("vector index", "web", 5, [])
+    cache.put("task scheduling", "internal", 5, [])
+    assert cache.invalidate_matching(["New notes on the Vector store."], ["internal"]) == 1
+    assert cache.get("vector index", "web", 5) is not None
+    assert cache.get("task scheduling", "internal", 5) is not None
+
+    cache.put("Task scheduling", "internal", 5, [_chunk("x", "internal")])
+    assert cache.invalidate_matching(["task notes"], ["internal"], keep=["task  SCHEDULING"]) == 0
+
+
+def test_pipeline_serves_repeat_queries_from_cache():
+    web, internal = CountingRetriever("web"), CountingRetriever("internal")
+    pipeline = RAGPipeline(web, internal, cache=RetrievalCache())
+    first = pipeline.run("Agent memory")
+    second = pipeline.run("agent   MEMORY")
+    assert web.calls == internal.calls == 1
+    assert [c.text for c in second.fused] == [c.text for c in first.fused]
+
+    pipeline.cache.invalidate_matching(["memory"], ["internal"])
+    pipeline.run("agent memory")
+    assert (web.calls, internal.calls) == (1, 2)
+
+
+class FlakyTools:
+    """Fails the first ``failures`` web searches, then answers like the stub tool."""
+
+    def __init__(self, failures):
+        self.failures = failures
+
+    def execute(self, request):
+        if self.failures:
+            self.failures -= 1
+            return ToolResponse(ok=False, name="web_search", error=ToolError("TIMEOUT", "down"))
+        return WebSearchTool().run(request)
+
+
+def test_failed_web_searches_are_dropped_not_cached():
+    pipeline = RAGPipeline(WebRetriever(FlakyTools(failures=1)), cache=RetrievalCache())
+    failed = pipeline.run("agent memory")
+    assert failed.dropped == {"web": "error: web_search failed: down"}
+    assert pipeline.cache.stats()["size"] == 0
+    assert [c.citation.source for c in pipeline.run("agent memory").fused] == ["web"]
+
+
+def test_answers_without_evidence_are_not_cached():
+    class Empty(CountingRetriever):
+        def retrieve(self, query, limit=5):
+            self.calls += 1
+            return []
+
+    empty = Empty("web")
+    pipeline = RAGPipeline(retrievers=[empty], answer_cache=AnswerCache())
+    assert pipeline.run("agent memory").answer.startswith("No evidence found")
+    assert not pipeline.run("agent memory").cached
+    assert empty.calls == 2
+
+
+def test_bypass_cache_skips_cached_retriever_results():
+    web = CountingRetriever("web")
+    pipeline = RAGPipeline(retrievers=[web], cache=RetrievalCache())
+    pipeline.run("agent memory")
+    pipeline.run("agent memory")
+    assert web.calls == 1
+    pipeline.run("agent memory", bypass_cache=True)
+    assert web.calls == 2
+
+
+def test_answer_cache_matches_normalized_and_similar_queries():
+    now = [0.0]
+    web = CountingRetriever("web")
+    cache = AnswerCache(
+        embedder=HashingEmbedder(), similarity=0.8, max_age_s=60, clock=lambda: now[0]
+    )
+    pipeline = RAGPipeline(retrievers=[web], answer_cache=cache)
+
+    first = pipeline.run("Survey agent memory designs")
+    assert not first.cached
+    exact = pipeline.run("survey  agent MEMORY designs")
+    similar = pipeline.run("Survey agent memory designs.")
+    assert exact.cached and similar.cached
+    assert similar.fused == first.fused and similar.fused is not first.fused
+    assert similar.query == "Survey agent memory designs."
+    assert similar.answer.startswith("Query: Survey agent memory designs.\n")
+    assert web.calls == 1
+
+    pipeline.run("Survey agent memory designs", limit=3)  # different limit: miss
+    pipeline.run("Gardening in spring")  # unrelated: miss
+    assert web.calls == 3
+
+    assert not pipeline.run("Survey agent memory designs", bypass_cache=True).cached
+    assert web.calls == 4
+
+    now[0] = 120
+    assert not pipeline.run("Survey agent memory designs").cached
+    assert cache.stats() == {
+        "hits": 2, "exact_hits": 1, "semantic_hits": 1, "misses": 4, "stale": 1,
+        "invalidations": 0, "size": 3,
+    }
+
+    # Both "survey" entries mention "agent"; the gardening one is untouched.
+    assert cache.invalidate_matching(["New notes on agent design"]) == 2
+    assert cache.stats()["size"] == 1
+    assert not pipeline.run("Survey agent memory designs").cached
+
+
+def test_entity_swapped_queries_miss_the_answer_cache():
+    web = CountingRetriever("web")
+    cache = AnswerCache(embedder=HashingEmbedder(), similarity=0.9)
+    pipeline = RAGPipeline(retrievers=[web], answer_cache=cache)
+    prefix = "Draft structured output for: Survey "
+    pipeline.run(prefix + "vector databases for retrieval augmented generation")
+    pipeline.run("Reduce latency in Python web services")
+
+    assert not pipeline.run(prefix + "graph databases for retrieval augmented generation").cached
+    assert not pipeline.run("Reduce latency in Go web services").cached
+    assert pipeline.run("reduce latency in python web services!").cached
+    assert web.calls == 4
+
+
+def test_answers_with_dropped_sources_are_not_cached():
+    class Broken:
+        name = "broken"
+
+        def retrieve(self, query, limit=5):
+            raise RuntimeError("down")
+
+    cache = AnswerCache()
+    pipeline = RAGPipeline(retrievers=[CountingRetriever("web"), Broken()], answer_cache=cache)
+    pipeline.run("q")
+    assert not pipeline.run("q").cached
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,152 @@
+import random
+
+import ace.core.rag.dedup as dedup
+from ace.core.rag.dedup import MinHasher, NearDuplicateFilter, shingles
+from ace.core.rag.fusion import MinMaxFusion, RAGFusion, ReciprocalRankFusion, ZScoreFusion
+from ace.core.rag.models import Citation, RetrievedChunk
+
+
+def _chunk(text, confidence=0.5, source="web"):
+    return RetrievedChunk(text=text, citation=Citation(source, text[:8], "ts", text, confidence))
+
+
+BASE = "SQLite WAL mode lets readers proceed while a single writer appends to the log"
+
+
+def test_near_duplicates_collapse_to_the_most_confident_copy():
+    chunks = [
+        _chunk(f"{BASE} (fetched 2024-05-01)", 0.6),
+        _chunk(f"{BASE.lower()}!! (fetched 2024-05-02)", 0.7, source="internal"),
+        _chunk(f"{BASE}, (fetched 2024-05-03)", 0.5),
+        _chunk("Reciprocal rank fusion combines ranked lists without score calibration", 0.4),
+    ]
+    fused = RAGFusion(max_chunks=8).fuse(chunks)
+    assert [c.citation.confidence for c in fused] == [0.7, 0.4]
+
+    without = RAGFusion(max_chunks=8, near_duplicates=None).fuse(chunks)
+    assert len(without) == 4
+
+
+def test_threshold_is_tunable():
+    chunks = [_chunk(BASE), _chunk(BASE.replace("single writer", "lone writer process"))]
+    assert len(NearDuplicateFilter(threshold=0.6).filter(chunks)) == 1
+    assert len(NearDuplicateFilter(threshold=0.95).filter(chunks)) == 2
+
+
+def test_minhash_signature_matches_without_numpy(monkeypatch):
+    feats = shingles(BASE)
+    with_np = MinHasher(32).signature(feats)
+    monkeypatch.setattr(dedup, "np", None)
+    assert MinHasher(32).signature(feats) == with_np
+
+
+def test_lsh_only_compares_colliding_pairs(monkeypatch):
+    calls = []
+    real = dedup.jaccard
+    monkeypatch.setattr(dedup, "jaccard", lambda a, b: calls.append(1) or real(a, b))
+    rng = random.Random(7)
+    words = [f"w{i}" for i in range(5000)]
+    chunks = [_chunk(" ".join(rng.sample(words, 12))) for _ in range(200)]
+    assert len(NearDuplicateFilter().filter(chunks)) == 200
+    assert len(calls) < 200 * 199 // 2 // 10
+
+
+def _ranked(source, texts, confidence):
+    return [_chunk(t, confidence, source) for t in texts]
+
+
+def test_rrf_interleaves_sources_instead_of_ranking_by_source_confidence():
+    web = _ranked("web", ["alpha facts", "beta facts", "gamma facts"], 0.6)
+    internal = _ranked("internal", ["delta notes", "epsilon notes", "alpha facts"], 0.7)
+    legacy = RAGFusion(max_chunks=3).fuse(web + internal)
+    assert {c.citation.source for c in legacy} == {"internal"}
+
+    fused = RAGFusion(max_chunks=3, strategy=ReciprocalRankFusion()).fuse(web + internal)
+    # "alpha facts" is in both lists, so its reciprocal ranks add up.
+    assert [c.text for c in fused] == ["alpha facts", "delta notes", "beta facts"]
+
+
+def test_near_duplicate_copies_pool_their_scores():
+    web = _ranked("web", [BASE, "beta facts"], 0.6)
+    internal = _ranked("internal", ["delta notes", f"{BASE.lower()}!"], 0.7)
+    fusion = RAGFusion(max_chunks=3, strategy=ReciprocalRankFusion())
+
+    acc = fusion.accumulator()
+    acc.add("web", web)
+    acc.add("internal", internal)
+    # The pair scores 1/61 + 1/62 and keeps the more confident internal copy.
+    (score, top), *rest = acc.top_scored()
+    assert (top.text, score) == (f"{BASE.lower()}!", 1 / 61 + 1 / 62)
+    assert [ch.text for _, ch in rest] == ["delta notes", "beta facts"]
+
+
+def test_weights_and_score_normalization():
+    web = _ranked("web", ["alpha facts", "beta facts"], 0.6)
+    internal = _ranked("internal", ["delta notes", "epsilon notes"], 0.7)
+    for ch, s in zip(internal, [40.0, 10.0], strict=True):
+        ch.score = s
+    for strategy in (MinMaxFusion(), ZScoreFusion()):
+        fusion = RAGFusion(max_chunks=4, strategy=strategy, weights={"web": 2.0})
+        assert [c.text for c in fusion.fuse(web + internal)][0] == "alpha facts"
+    assert MinMaxFusion().scores(internal) == [1.0, 0.0]
+    assert ZScoreFusion().scores(internal) == [1.0, -1.0]
+
+
+def test_accumulator_takes_batches_as_they_arrive():
+    acc = RAGFusion(max_chunks=2, strategy=ReciprocalRankFusion()).accumulator()
+    acc.add("internal", _ranked("internal", ["delta notes", "alpha facts"], 0.7), position=1)
+    acc.add("web", _ranked("web", ["alpha facts", "beta facts"], 0.6), position=0)
+    scored = acc.top_scored()
+    assert [c.text for _, c in scored] == ["alpha facts", "delta notes"]
+    assert scored[0][1].citation.source == "internal"  # most confident copy kept
+
+
+def test_budget_packs_by_relevance_per_char_and_truncates_at_sentences():
+    huge = " ".join(f"Sentence {i} about write-ahead logging." for i in range(40))
+    chunks = [
+        _chunk(huge, 0.9, "internal"),
+        _chunk("WAL keeps readers unblocked.", 0.6),
+        _chunk("Checkpoints copy WAL pages back.", 0.5),
+    ]
+    chunks[0].citation.start, chunks[0].citation.end = 100, 100 + len(huge)
+    acc = RAGFusion(max_chunks=8, budget=200).accumulator()
+    for ch in chunks:
+        acc.add(ch.citation.source, [ch])
+    fused, report = acc.select()
+
+    # Short chunks win on density; the long one is cut to the remaining room.
+    assert [c.citation.confidence for c in fused] == [0.9, 0.6, 0.5]
+    assert report.used <= 200
+    cut = fused[0]
+    assert cut.text.endswith("logging.") and len(cut.text) < len(huge)
+    assert huge.startswith(cut.text)
+    assert cut.citation.end == 100 + len(cut.text)
+    assert [e.decision for e in report.entries] == ["truncated", "kept", "kept"]
+    assert report.to_dict()["entries"][1]["used"] == len("WAL keeps readers unblocked.")
+
+
+def test_truncated_snippet_stays_inside_the_kept_text():
+    title = "Write-ahead logging"
+    body = "Readers keep going. Writers append to the log. Checkpoints copy pages back."
+    cit = Citation("web", "url", "ts", body, 0.6)
+    chunk = RetrievedChunk(text=f"{title}\n{body}", citation=cit)
+    acc = RAGFusion(budget=len(title) + 22).accumulator()
+    acc.add("web", [chunk])
+    (cut,), report = acc.select()
+
+    assert report.entries[0].decision == "truncated"
+    assert cut.citation.snippet == "Readers keep going."
+    assert cut.citation.snippet in cut.text
+
+
+def test_budget_skips_what_cannot_fit_and_counts_tokens():
+    chunks = [_chunk("one two three four five six", 0.9), _chunk("alpha beta", 0.4)]
+    fused, report = RAGFusion(budget=3, budget_unit="tokens").accumulator().select()
+    assert fused == [] and report.used == 0
+
+    acc = RAGFusion(budget=3, budget_unit="tokens").accumulator()
+    acc.add("web", chunks)
+    fused, report = acc.select()
+    assert [c.text for c in fused] == ["alpha beta"]
+    assert [e.decision for e in report.entries] == ["skipped", "kept"]
+    assert RAGFusion().accumulator().select()[1] is None
@@ -0,0 +1,133 @@
+import time
+
+from ace.core.rag.fusion import RAGFusion
+from ace.core.rag.models import Citation, RetrievedChunk
+from ace.core.rag.pipeline import RAGPipeline
+
+
+class FakeRetriever:
+    def __init__(self, name, delay=0.0, fail=False, confidence=0.5):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.confidence = confidence
+
+    def retrieve(self, query, limit=5):
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("backend down")
+        cit = Citation(self.name, f"{self.name}:1", "ts", query, self.confidence)
+        return [RetrievedChunk(text=f"{self.name} says {query}", citation=cit)]
+
+
+def test_retrievers_run_concurrently_and_fuse_in_retriever_order():
+    retrievers = [FakeRetriever(n, delay=0.2) for n in ("a", "b", "c")]
+    pipeline = RAGPipeline(retrievers=retrievers, fusion=RAGFusion(max_chunks=8))
+
+    start = time.monotonic()
+    chunks, dropped = pipeline.retrieve("q")
+    assert time.monotonic() - start < 0.5
+    assert [c.citation.source for c in chunks] == ["a", "b", "c"]
+    assert dropped == {}
+
+
+def test_slow_and_failing_retrievers_are_dropped():
+    pipeline = RAGPipeline(
+        retrievers=[
+            FakeRetriever("fast"),
+            FakeRetriever("slow", delay=2.0),
+            FakeRetriever("broken", fail=True),
+            FakeRetriever("patient", delay=0.3),
+        ],
+        timeouts={"slow": 0.1, "patient": 1.0},
+        deadline_s=1.5,
+    )
+    start = time.monotonic()
+    result = pipeline.run("q")
+    assert time.monotonic() - start < 1.0
+    assert {c.citation.source for c in result.fused} == {"fast", "patient"}
+    assert result.dropped["slow"] == "timeout"
+    assert result.dropped["broken"].startswith("error:")
+
+
+def test_overall_deadline_caps_every_retriever():
+    pipeline = RAGPipeline(
+        retrievers=[FakeRetriever("a", delay=1.0), FakeRetriever("b")],
+        timeout_s=5.0,
+        deadline_s=0.2,
+    )
+    result = pipeline.run("q")
+    assert result.dropped == {"a": "timeout"}
+    assert [c.citation.source for c in result.fused] == ["b"]
+
+
+def test_time_queued_in_a_busy_pool_does_not_count_against_retrievers():
+    pipeline = RAGPipeline(
+        retrievers=[FakeRetriever("a", delay=0.3), FakeRetriever("b", delay=0.3)],
+        timeout_s=0.5,
+        max_workers=1,
+    )
+    result = pipeline.run("q")
+    assert result.dropped == {}
+    assert {c.citation.source for c in result.fused} == {"a", "b"}
+
+    pipeline.ensure_workers(4)
+    assert pipeline.max_workers == 8
+    pipeline.close()
+
+
+def test_pipeline_reuses_one_retriever_pool_until_closed():
+    retrievers = [FakeRetriever("fast"), FakeRetriever("slow", delay=0.3)]
+    with RAGPipeline(retrievers=retrievers, timeout_s=0.05) as pipeline:
+        pool = None
+        for i in range(5):
+            result = pipeline.run(f"q{i}")
+            assert result.dropped == {"slow": "timeout"}
+            assert [c.citation.source for c in result.fused] == ["fast"]
+            assert pool in (None, pipeline._pool)
+            pool = pipeline._pool
+        # Stragglers from timed-out calls stay on the shared, bounded pool.
+        assert len(pool._threads) <= pipeline.max_workers
+    assert pipeline._pool is None and pool._shutdown
+
+
+def test_internal_retriever_cites_passage_offsets(tmp_path):
+    from ace.core.memory import Memory
+    from ace.core.rag.retrievers import InternalRetriever
+
+    system = Memory.create_default(data_dir=tmp_path / "data", audit_dir=tmp_path / "audit").system
+    long_text = " ".join(f"Filler sentence number {i} about planning." for i in range(40))
+    long_text += " The checkpoint writer debounces state snapshots."
+    system.remember_long_term("answer:1", long_text, tags=["episode"])
+
+    chunks = InternalRetriever(system).retrieve("checkpoint debounces", limit=3)
+    top = chunks[0]
+    assert top.citation.source_id == "answer:1"
+    assert len(top.text) < len(long_text)
+    assert long_text[top.citation.start : top.citation.end] == top.text
+    assert "checkpoint writer" in top.text
+
+    answer = RAGPipeline(retrievers=[InternalRetriever(system)]).run("checkpoint debounces").answer
+    assert f"chars {top.citation.start}-{top.citation.end}" in answer
+    system.close()
+
+
+def test_result_streams_answer_and_chunk_lines():
+    result = RAGPipeline(retrievers=[FakeRetriever("a"), FakeRetriever("b")]).run("q")
+    assert result._answer is None  # nothing joined until someone asks for it
+    assert "\n".join(result.lines()) == result.answer
+    rows = list(result.chunk_lines())
+    assert rows == [c.to_json() for c in result.fused] and len(rows) == 2
+
+
+def test_semantic_top_up_skips_unrelated_records(tmp_path):
+    from ace.core.memory import Memory
+    from ace.core.rag.retrievers import InternalRetriever
+
+    system = Memory.create_default(data_dir=tmp_path / "data", audit_dir=tmp_path / "audit").system
+    system.remember_long_term("near", "Debounced checkpoints of writer state.")
+    system.remember_long_term("far", "Bananas are a yellow tropical fruit grown in warm climates.")
+
+    ids = [c.citation.source_id for c in InternalRetriever(system).retrieve("checkpointing", 5)]
+    assert ids == ["near"]
+    system.close()
@@ -0,0 +1,54 @@
+import pytest
+
+import ace.core.rag.rerank as rerank
+from ace.core.embedding import HashingEmbedder
+from ace.core.memory import Memory
+from ace.core.rag.models import Citation, RetrievedChunk
+from ace.core.rag.rerank import BatchReranker
+from ace.core.rag.retrievers import InternalRetriever
+
+DOCS = [
+    "Gardening tips for spring tomatoes",
+    "SQLite write-ahead logging lets readers run during a write",
+    "Logging levels in Python: DEBUG, INFO and WARNING",
+    "Write-ahead logging in SQLite: checkpoints move WAL pages into the database",
+]
+
+
+def _chunks(texts):
+    return [
+        RetrievedChunk(text=t, citation=Citation("internal", f"r{i}", "ts", t, 0.7))
+        for i, t in enumerate(texts)
+    ]
+
+
+def test_rerank_orders_by_relevance_and_sets_score():
+    ranked = BatchReranker(embedder=HashingEmbedder()).rerank(
+        "sqlite write-ahead logging", _chunks(DOCS), limit=3
+    )
+    ids = [c.citation.source_id for c in ranked]
+    assert set(ids[:2]) == {"r1", "r3"} and ids[2] == "r2"
+    scores = [c.score for c in ranked]
+    assert scores == sorted(scores, reverse=True)
+    assert all(0.0 <= s <= 1.0 for s in scores)
+    # Confidence stays on the retriever's scale, comparable with other sources.
+    assert all(c.citation.confidence == 0.7 for c in ranked)
+
+
+def test_vectorized_and_pure_python_scores_agree(monkeypatch):
+    reranker = BatchReranker(embedder=HashingEmbedder())
+    with_np = reranker.scores("sqlite logging", DOCS)
+    monkeypatch.setattr(rerank, "np", None)
+    assert reranker.scores("sqlite logging", DOCS) == pytest.approx(with_np, abs=1e-5)
+
+
+def test_internal_retriever_reranks_a_wide_candidate_set(tmp_path):
+    system = Memory.create_default(data_dir=tmp_path / "data", audit_dir=tmp_path / "audit").system
+    system.remember_long_term_many({"record_id": f"r{i}", "text": t} for i, t in enumerate(DOCS))
+
+    retriever = InternalRetriever(system, reranker=BatchReranker(), candidates=50)
+    chunks = retriever.retrieve("sqlite write-ahead logging", limit=2)
+    assert len(chunks) == 2
+    assert {c.citation.source_id for c in chunks} == {"r1", "r3"}
+    assert all(c.score is not None and c.citation.confidence == 0.70 for c in chunks)
+    system.close()
@@ -0,0 +1,44 @@
+import pytest
+
+from ace.core.models import Task
+from ace.core.scheduler import DAGScheduler, TaskGraphError
+
+
+def _drain(sched):
+    order = []
+    while (task := sched.pop_ready()) is not None:
+        order.append(task.id)
+        sched.mark_done(task.id)
+    return order
+
+
+def test_releases_dependents_in_priority_order():
+    tasks = [
+        Task(id="a", description="a", priority=1),
+        Task(id="c", description="c", priority=3, depends_on=["a"]),
+        Task(id="b", description="b", priority=2, depends_on=["a"]),
+        Task(id="d", description="d", priority=1, depends_on=["b", "c"]),
+    ]
+    sched = DAGScheduler(tasks)
+    assert _drain(sched) == ["a", "b", "c", "d"]
+    assert len(sched) == 0
+
+
+def test_completed_dependencies_are_pre_satisfied():
+    sched = DAGScheduler([Task(id="b", description="b", depends_on=["a"])], completed={"a"})
+    assert _drain(sched) == ["b"]
+
+
+def test_rejects_missing_dependencies_and_cycles():
+    for tasks, message in [
+        ([Task(id="a", description="a", depends_on=["zzz"])], "Unknown dependencies"),
+        (
+            [
+                Task(id="a", description="a", depends_on=["b"]),
+                Task(id="b", description="b", depends_on=["a"]),
+            ],
+            "cycle",
+        ),
+    ]:
+        with pytest.raises(TaskGraphError, match=message):
+            DAGScheduler(tasks)
@@ -0,0 +1,216 @@
+import json
+
+import pytest
+
+from ace.core.agent import Agent
+from ace.core.checkpoint import CheckpointWriter
+from ace.core.goal_journal import GoalJournal
+from ace.core.memory import Memory
+from ace.core.planner import RuleBasedPlanner
+from ace.core.reasoning.rule_reasoner import RuleBasedReasoner
+from ace.core.reflector import Reflector
+from ace.core.state_machine import AgentStateMachine
+from ace.core.tools.file_writer import FileWriterTool
+from ace.core.tools.registry import ToolRegistry
+from ace.core.tools.tool_executor import ToolExecutor
+from ace.core.tools.web_search import WebSearchTool
+
+
+def _machine(tmp_path, monkeypatch, **kwargs):
+    monkeypatch.chdir(tmp_path)
+    registry = ToolRegistry()
+    registry.register(WebSearchTool())
+    registry.register(FileWriterTool(base_dir="artifacts"))
+    agent = Agent(
+        memory=Memory.create_default(),
+        planner=RuleBasedPlanner(),
+        reasoner=RuleBasedReasoner(),
+        reflector=Reflector(),
+        tool_executor=ToolExecutor(registry=registry, max_retries=0),
+    )
+    return AgentStateMachine(agent, audit_dir=tmp_path / "audit", **kwargs)
+
+
+def test_checkpoint_writer_coalesces_within_interval(tmp_path):
+    writer = CheckpointWriter(tmp_path / "state.json", min_interval_s=60)
+    for i in range(5):
+        writer.write({"step": i})
+    assert writer.writes == 1
+    writer.flush()
+    assert writer.writes == 2
+    assert json.loads((tmp_path / "state.json").read_text()) == {"step": 4}
+
+
+def test_run_goal_checkpoints_state_and_logs_episodes(tmp_path, monkeypatch):
+    sm = _machine(tmp_path, monkeypatch, checkpoint_interval_s=60)
+    goal = "Survey agent memory designs"
+    reason = sm.run_goal(goal, RuleBasedPlanner().decompose(goal))
+
+    assert reason == "Halted: All tasks completed"
+    state = json.loads((tmp_path / "audit" / "state.json").read_text())
+    assert state["current_task"] is None
+    episodes = sm.agent.memory.system.episodic.query()
+    assert [e["task_id"] for e in episodes] == ["t1", "t2", "t3", "t4"]
+
+
+def test_run_once_persists_the_finished_state(tmp_path, monkeypatch):
+    sm = _machine(tmp_path, monkeypatch, checkpoint_interval_s=60)
+    assert sm.run_once(RuleBasedPlanner().decompose("Survey agent memory designs")[0])
+
+    state = json.loads((tmp_path / "audit" / "state.json").read_text())
+    assert state["status"] == "completed"
+    assert state["current_task"] is None and state["completed_tasks"] == 1
+
+
+def test_selection_records_whether_the_answer_was_cached(tmp_path, monkeypatch):
+    sm = _machine(tmp_path, monkeypatch)
+    task = RuleBasedPlanner().decompose("Survey agent memory designs")[0]
+    selection = tmp_path / "artifacts" / f"task_{task.id}" / "selection.json"
+
+    sm.run_once(task)
+    assert json.loads(selection.read_text())["cached"] is False
+    sm.run_once(task)
+    assert json.loads(selection.read_text())["cached"] is True
+
+
+def test_tasks_are_journaled_only_after_their_writes_are_durable(tmp_path, monkeypatch):
+    sm = _machine(tmp_path, monkeypatch)
+    system = sm.agent.memory.system
+    system.enable_write_behind()
+    system.episodic.flush_every = 100
+    seen = []
+    original = GoalJournal.task_done
+
+    def task_done(journal, task_id, *args):
+        seen.append((task_id, system.writer.pending, system.episodic._unflushed))
+        original(journal, task_id, *args)
+
+    monkeypatch.setattr(GoalJournal, "task_done", task_done)
+    goal = "Survey agent memory designs"
+    sm.run_goal(goal, RuleBasedPlanner().decompose(goal))
+    system.close()
+
+    assert seen == [(t, 0, 0) for t in ("t1", "t2", "t3", "t4")]
+
+
+def test_resume_goal_skips_tasks_finished_before_a_crash(tmp_path, monkeypatch):
+    sm = _machine(tmp_path, monkeypatch)
+    goal = "Survey agent memory designs"
+    tasks = RuleBasedPlanner().decompose(goal)
+
+    real_run_once = sm.run_once
+
+    def crash_on_t3(task):
+        if task.id == "t3":
+            raise KeyboardInterrupt
+        return real_run_once(task)
+
+    monkeypatch.setattr(sm, "run_once", crash_on_t3)
+    with pytest.raises(KeyboardInterrupt):
+        sm.run_goal(goal, tasks)
+    goal_id = sm.goal_id
+
+    resumed = _machine(tmp_path, monkeypatch)
+    ran = []
+    real = resumed.run_once
+    monkeypatch.setattr(resumed, "run_once", lambda t: ran.append(t.id) or real(t))
+
+    assert resumed.resume_goal(goal_id) == "Halted: All tasks completed"
+    assert ran == ["t3", "t4"]
+    assert set(resumed.results) == {"t1", "t2", "t3", "t4"}
+
+
+def test_run_goal_with_workers_runs_independent_tasks_concurrently(tmp_path, monkeypatch):
+    import threading
+
+    from ace.core.models import Task
+
+    sm = _machine(tmp_path, monkeypatch)
+    tasks = [
+        Task(id="a", description="Research vector indexes", priority=1),
+        Task(id="b", description="Research write-ahead logging", priority=2),
+        Task(id="c", description="Research task scheduling", priority=3),
+        Task(id="d", description="Summarize the findings", depends_on=["a", "b", "c"]),
+    ]
+    barrier = threading.Barrier(3, timeout=10)
+    real_run_once = sm.run_once
+
+    def run_once(task):
+        if task.id != "d":
+            barrier.wait()  # a, b and c must be in flight together
+        return real_run_once(task)
+
+    monkeypatch.setattr(sm, "run_once", run_once)
+    assert sm.run_goal("Research agents", tasks, workers=3) == "Halted: All tasks completed"
+
+    assert set(sm.results) == {"a", "b", "c", "d"}
+    assert sm.state.running_tasks == [] and sm.state.current_task is None
+    episodes = sm.agent.memory.system.episodic.query()
+    assert [e["task_id"] for e in episodes] == ["a", "b", "c", "d"]
+
+
+def test_concurrent_tasks_are_journaled_only_after_their_episodes(tmp_path, monkeypatch):
+    import threading
+
+    from ace.core.models import Task
+
+    sm = _machine(tmp_path, monkeypatch)
+    tasks = [
+        Task(id="a", description="Research vector indexes", priority=1),
+        Task(id="b", description="Research write-ahead logging", priority=2),
+    ]
+    b_recorded = threading.Event()
+    real_run_once, real_record = sm.run_once, sm._record_outcome
+
+    def run_once(task):
+        if task.id == "a":  # crash once b, later in serial order, has finished
+            assert b_recorded.wait(timeout=10)
+            raise KeyboardInterrupt
+        return real_run_once(task)
+
+    def record(task, *args):
+        real_record(task, *args)
+        if task.id == "b":
+            b_recorded.set()
+
+    monkeypatch.setattr(sm, "run_once", run_once)
+    monkeypatch.setattr(sm, "_record_outcome", record)
+    with pytest.raises(KeyboardInterrupt):
+        sm.run_goal("Research agents", tasks, workers=2)
+    assert sm.agent.memory.system.episodic.query() == []  # b's episode was still buffered
+
+    resumed = _machine(tmp_path, monkeypatch)
+    ran = []
+    real = resumed.run_once
+    monkeypatch.setattr(resumed, "run_once", lambda t: ran.append(t.id) or real(t))
+    assert resumed.resume_goal(sm.goal_id) == "Halted: All tasks completed"
+    assert ran == ["a", "b"]
+
+
+def test_ltm_writes_invalidate_cached_internal_results(tmp_path, monkeypatch):
+    sm = _machine(tmp_path, monkeypatch)
+    sm.pipeline.run("sqlite wal mode")
+    assert sm.retrieval_cache.stats()["size"] == 2
+    assert sm.answer_cache.stats()["size"] == 1
+
+    sm.agent.memory.system.remember_long_term("note:1", "SQLite WAL lets readers continue")
+    assert sm.retrieval_cache.get("sqlite wal mode", "internal", 5) is None
+    assert sm.answer_cache.stats()["size"] == 0
+    assert sm.retrieval_cache.get("sqlite wal mode", "web", 5) is not None
+
+
+def test_own_chunk_writes_keep_the_cache_and_close_detaches(tmp_path, monkeypatch):
+    sm = _machine(tmp_path, monkeypatch)
+    sm.pipeline.run("agent memory notes")
+    task = RuleBasedPlanner().decompose("Survey agent memory designs")[0]
+    sm.run_once(task)
+    assert sm.retrieval_cache.get(task.description, "internal", 5) is not None
+    # Another query's entries are still invalidated by the task's writes.
+    assert sm.retrieval_cache.get("agent memory notes", "internal", 5) is None
+    assert sm.answer_cache.stats()["size"] == 1
+
+    system = sm.agent.memory.system
+    sm.close()
+    assert sm._invalidate_internal_cache not in system.write_listeners
+    system.remember_long_term("note:1", task.description)
+    assert sm.retrieval_cache.get(task.description, "internal", 5) is not None